@@ -16,8 +16,9 @@ IMAGE_TAG="v1.0"
 HARBOR_USERNAME="admin"
 HARBOR_PASSWORD="Harbor12345"
 
-# Component paths
-COMPONENTS_DIR="/home/kfmrgnmn/projects/kubeflow/iris_kubeflow/components"
+# Build context is iris_kubeflow/ so images can include the shared common/ modules
+BUILD_CONTEXT_DIR="/home/kfmrgnmn/projects/kubeflow/iris_kubeflow"
+COMPONENTS_DIR="$BUILD_CONTEXT_DIR/components"
 
 # Components to build
 COMPONENTS=("download" "train" "predict")
@@ -49,7 +50,7 @@ for component in "${COMPONENTS[@]}"; do
 
     # Build the image
     echo "Building image: $IMAGE_NAME"
-    docker build -t "$IMAGE_NAME" "$COMPONENT_PATH"
+    docker build -t "$IMAGE_NAME" -f "$COMPONENT_PATH/Dockerfile" "$BUILD_CONTEXT_DIR"
     echo "✓ Image built successfully"
     echo ""
 
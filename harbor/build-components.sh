@@ -16,8 +16,9 @@ IMAGE_TAG="v1.0"
 NAMESPACE="kubeflow"
 SECRET_NAME="harbor-credentials"
 
-# Component paths
-COMPONENTS_BASE_DIR="/home/kfmrgnmn/projects/kubeflow/iris_kubeflow/components"
+# Build context is iris_kubeflow/ so images can include the shared common/ modules
+BUILD_CONTEXT_DIR="/home/kfmrgnmn/projects/kubeflow/iris_kubeflow"
+COMPONENTS_BASE_DIR="$BUILD_CONTEXT_DIR/components"
 
 # Components to build
 declare -A COMPONENTS
@@ -35,10 +36,12 @@ echo ""
 create_kaniko_job() {
     local component_name=$1
     local context_path=$2
+    local dockerfile_path=$3
     local image_name="${HARBOR_REGISTRY}/${HARBOR_PROJECT}/iris-${component_name}:${IMAGE_TAG}"
 
     echo "Creating Kaniko job for component: $component_name"
     echo "  Context path: $context_path"
+    echo "  Dockerfile: $dockerfile_path"
     echo "  Image name: $image_name"
 
     cat <<EOF | kubectl apply -f -
@@ -56,7 +59,7 @@ spec:
       - name: kaniko
         image: gcr.io/kaniko-project/executor:v1.9.0
         args:
-        - "--dockerfile=Dockerfile"
+        - "--dockerfile=${dockerfile_path}"
         - "--context=${context_path}"
         - "--destination=${image_name}"
         - "--insecure"
@@ -76,7 +79,7 @@ spec:
             path: config.json
       - name: components-source
         hostPath:
-          path: ${COMPONENTS_BASE_DIR}
+          path: ${BUILD_CONTEXT_DIR}
           type: Directory
 EOF
 
@@ -93,10 +96,11 @@ for component in "${!COMPONENTS[@]}"; do
     kubectl delete job "kaniko-build-${component}" -n $NAMESPACE 2>/dev/null || true
     sleep 2
 
-    # Create context path relative to mounted volume
-    context_path="/workspace/${component}"
+    # Context is the mounted iris_kubeflow/ directory, Dockerfile is per component
+    context_path="/workspace"
+    dockerfile_path="components/${component}/Dockerfile"
 
-    create_kaniko_job "$component" "$context_path"
+    create_kaniko_job "$component" "$context_path" "$dockerfile_path"
 done
 
 echo "=========================================="
@@ -0,0 +1,191 @@
+"""
+Decides which images the CI pipeline has to build.
+
+Each image is tagged with a hash of everything that goes into it, so an image
+whose tag already exists in the registry is up to date and its build can be
+skipped. Runs on a plain python image against the cloned workspace and only
+uses the standard library.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+COMPONENTS = ('download', 'train', 'predict')
+DEFAULT_BASE_IMAGE = 'python:3.9-slim'
+TAG_LENGTH = 16
+
+MANIFEST_TYPES = ', '.join([
+    'application/vnd.oci.image.index.v1+json',
+    'application/vnd.oci.image.manifest.v1+json',
+    'application/vnd.docker.distribution.manifest.list.v2+json',
+    'application/vnd.docker.distribution.manifest.v2+json',
+])
+
+def iter_files(root: str, paths: list):
+    """Yields (relative path, absolute path) for the given files and directories, sorted."""
+    files = []
+    for path in paths:
+        full_path = os.path.join(root, path)
+        if os.path.isfile(full_path):
+            files.append(path)
+            continue
+        for dirpath, dirnames, filenames in os.walk(full_path):
+            dirnames[:] = [d for d in dirnames if d != '__pycache__']
+            for name in filenames:
+                if not name.endswith('.pyc'):
+                    files.append(os.path.relpath(os.path.join(dirpath, name), root))
+    for rel_path in sorted(files):
+        yield rel_path.replace(os.sep, '/'), os.path.join(root, rel_path)
+
+def content_hash(root: str, paths: list, parent_hash: str = '') -> str:
+    """Hashes file paths and contents, plus the hash of the image this one is built FROM."""
+    digest = hashlib.sha256(parent_hash.encode())
+    for rel_path, full_path in iter_files(root, paths):
+        digest.update(rel_path.encode() + b'\0')
+        with open(full_path, 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()[:TAG_LENGTH]
+
+def component_inputs(name: str) -> list:
+    """Paths, relative to the build context, that make up a component image."""
+    return [
+        f'components/{name}/Dockerfile',
+        f'components/{name}/requirements.txt',
+        f'components/{name}/src',
+        'common',
+    ]
+
+def load_registry_auth(docker_config_path: str) -> dict:
+    """
+    Maps registry host to the base64 user:password from a docker config.json.
+
+    Falls back to .dockerconfigjson in the same directory, the key a mounted
+    kubernetes.io/dockerconfigjson secret stores the same document under.
+    """
+    if docker_config_path and not os.path.exists(docker_config_path):
+        docker_config_path = os.path.join(os.path.dirname(docker_config_path), '.dockerconfigjson')
+    if not docker_config_path or not os.path.exists(docker_config_path):
+        return {}
+    with open(docker_config_path) as f:
+        auths = json.load(f).get('auths', {})
+    return {re.sub(r'^https?://', '', host).rstrip('/'): entry.get('auth') for host, entry in auths.items()}
+
+def _bearer_token(challenge: str, basic_auth: str):
+    """Fetches a pull token for registries (such as Harbor) that answer 401 with a Bearer challenge."""
+    params = dict(re.findall(r'(\w+)="([^"]*)"', challenge))
+    realm = params.pop('realm', None)
+    if not realm:
+        return None
+    request = urllib.request.Request(f"{realm}?{urllib.parse.urlencode(params)}")
+    if basic_auth:
+        request.add_header('Authorization', f'Basic {basic_auth}')
+    with urllib.request.urlopen(request, timeout=10) as response:
+        body = json.load(response)
+    return body.get('token') or body.get('access_token')
+
+def image_exists(image: str, registry_auth: dict, scheme: str = 'https') -> bool:
+    """Checks the registry for the image's manifest. Any failure counts as missing, which forces a build."""
+    host, _, rest = image.partition('/')
+    repository, _, tag = rest.rpartition(':')
+    url = f'{scheme}://{host}/v2/{repository}/manifests/{tag}'
+    basic_auth = registry_auth.get(host)
+
+    def head(authorization=None):
+        request = urllib.request.Request(url, method='HEAD', headers={'Accept': MANIFEST_TYPES})
+        if authorization:
+            request.add_header('Authorization', authorization)
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                return response.status == 200
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return False
+            raise
+
+    try:
+        try:
+            return head(f'Basic {basic_auth}' if basic_auth else None)
+        except urllib.error.HTTPError as e:
+            challenge = e.headers.get('WWW-Authenticate', '')
+            if e.code != 401 or not challenge.startswith('Bearer'):
+                raise
+            token = _bearer_token(challenge, basic_auth)
+            return bool(token) and head(f'Bearer {token}')
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        print(f"Could not check {image} ({e}), it will be rebuilt.")
+        return False
+
+def plan_builds(workspace: str, image_prefix: str, use_base_image: bool,
+                registry_auth: dict, registry_scheme: str = 'https', force_rebuild: bool = False) -> dict:
+    """Returns the image, content hash and whether a build is needed for the base and each component."""
+    plan = {}
+
+    base_hash = ''
+    if use_base_image:
+        base_hash = content_hash(workspace, ['components/base'])
+        base_image = f'{image_prefix}/iris-base:{base_hash}'
+        plan['base'] = {
+            'image': base_image,
+            'hash': base_hash,
+            'build': force_rebuild or not image_exists(base_image, registry_auth, registry_scheme),
+        }
+    else:
+        plan['base'] = {'image': DEFAULT_BASE_IMAGE, 'hash': '', 'build': False}
+
+    for name in COMPONENTS:
+        component_hash = content_hash(workspace, component_inputs(name), base_hash)
+        image = f'{image_prefix}/iris-{name}:{component_hash}'
+        plan[name] = {
+            'image': image,
+            'hash': component_hash,
+            'build': force_rebuild or not image_exists(image, registry_auth, registry_scheme),
+        }
+
+    return plan
+
+def write_output(path: str, value: str):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(value)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Plan which CI images need to be built.')
+    parser.add_argument('--workspace', type=str, required=True, help='Path to the iris_kubeflow directory in the cloned repository.')
+    parser.add_argument('--image_prefix', type=str, required=True, help='Registry and project prefix for the images, e.g. myharbor.domain/my-project.')
+    parser.add_argument('--use_base_image', type=str, default='false', help="'true' to build components FROM a shared base image.")
+    parser.add_argument('--force_rebuild', type=str, default='false', help="'true' to rebuild every image regardless of its content hash.")
+    parser.add_argument('--docker_config_path', type=str, default='/kaniko/.docker/config.json', help='docker config.json with registry credentials.')
+    parser.add_argument('--insecure_registry', type=str, default='false', help="'true' to query a plain HTTP registry.")
+    parser.add_argument('--plan_output_path', type=str, required=True, help='Path to save the build plan as JSON.')
+    parser.add_argument('--output', nargs=2, action='append', default=[], metavar=('NAME', 'PATH'),
+                        help="Write one plan value, e.g. 'train_image' or 'train_build', to PATH. Repeatable.")
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    plan = plan_builds(
+        args.workspace,
+        args.image_prefix.rstrip('/'),
+        args.use_base_image.lower() == 'true',
+        load_registry_auth(args.docker_config_path),
+        'http' if args.insecure_registry.lower() == 'true' else 'https',
+        args.force_rebuild.lower() == 'true',
+    )
+    plan_seconds = round(time.perf_counter() - start, 3)
+
+    write_output(args.plan_output_path, json.dumps({'images': plan, 'plan_seconds': plan_seconds}, indent=2))
+    values = {}
+    for name, entry in plan.items():
+        values[f'{name}_image'] = entry['image']
+        values[f'{name}_build'] = str(entry['build']).lower()
+    for name, path in args.output:
+        write_output(path, values[name])
+
+    for name, entry in plan.items():
+        print(f"{name}: {entry['image']} ({'build' if entry['build'] else 'up to date'})")
@@ -0,0 +1,9 @@
+import os
+import sys
+
+CI_COMPONENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The component scripts are run as plain files inside their containers, so
+# make them importable the same way here
+for component in ('build-plan', 'trigger-pipeline'):
+    sys.path.insert(0, os.path.join(CI_COMPONENTS_DIR, component, 'src'))
@@ -0,0 +1,101 @@
+import pytest
+
+import build_plan
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+@pytest.fixture
+def workspace(tmp_path):
+    """Minimal iris_kubeflow build context with the base image and every component."""
+    write(tmp_path / 'components/base/Dockerfile', 'FROM python:3.9-slim\n')
+    write(tmp_path / 'components/base/requirements.txt', 'pandas\n')
+    for name in build_plan.COMPONENTS:
+        write(tmp_path / f'components/{name}/Dockerfile', 'ARG BASE_IMAGE=python:3.9-slim\nFROM ${BASE_IMAGE}\n')
+        write(tmp_path / f'components/{name}/requirements.txt', 'pandas\n')
+        write(tmp_path / f'components/{name}/src/{name}.py', 'print("hello")\n')
+    write(tmp_path / 'common/structured_logging.py', 'import logging\n')
+    return tmp_path
+
+def train_hash(workspace):
+    return build_plan.content_hash(str(workspace), build_plan.component_inputs('train'))
+
+@pytest.mark.parametrize('changed_file', [
+    'components/train/src/train.py',
+    'components/train/requirements.txt',
+    'components/train/Dockerfile',
+    'common/structured_logging.py',
+])
+def test_content_hash_changes_with_inputs(workspace, changed_file):
+    before = train_hash(workspace)
+    write(workspace / changed_file, 'changed\n')
+    assert train_hash(workspace) != before
+
+def test_content_hash_ignores_other_components_and_bytecode(workspace):
+    before = train_hash(workspace)
+    write(workspace / 'components/predict/src/predict.py', 'changed\n')
+    write(workspace / 'components/train/src/__pycache__/train.cpython-39.pyc', 'bytecode')
+    assert train_hash(workspace) == before
+
+def test_content_hash_changes_with_parent(workspace):
+    inputs = build_plan.component_inputs('train')
+    assert build_plan.content_hash(str(workspace), inputs, 'a') != build_plan.content_hash(str(workspace), inputs, 'b')
+
+def test_plan_skips_existing_images(workspace, monkeypatch):
+    checked = []
+    def image_exists(image, registry_auth, scheme='https'):
+        checked.append(image)
+        return True
+    monkeypatch.setattr(build_plan, 'image_exists', image_exists)
+
+    plan = build_plan.plan_builds(str(workspace), 'registry.local/iris', True, {})
+
+    assert set(plan) == {'base', *build_plan.COMPONENTS}
+    assert not any(entry['build'] for entry in plan.values())
+    assert checked == [entry['image'] for entry in plan.values()]
+    assert plan['train']['image'] == f"registry.local/iris/iris-train:{plan['train']['hash']}"
+
+def test_plan_builds_missing_images(workspace, monkeypatch):
+    monkeypatch.setattr(build_plan, 'image_exists', lambda image, registry_auth, scheme='https': 'iris-train' not in image)
+
+    plan = build_plan.plan_builds(str(workspace), 'registry.local/iris', True, {})
+
+    assert {name: entry['build'] for name, entry in plan.items()} == {
+        'base': False, 'download': False, 'train': True, 'predict': False,
+    }
+
+def test_plan_force_rebuild(workspace, monkeypatch):
+    monkeypatch.setattr(build_plan, 'image_exists', lambda image, registry_auth, scheme='https': True)
+
+    plan = build_plan.plan_builds(str(workspace), 'registry.local/iris', True, {}, force_rebuild=True)
+
+    assert all(entry['build'] for entry in plan.values())
+
+def test_base_image_change_rebuilds_components(workspace, monkeypatch):
+    monkeypatch.setattr(build_plan, 'image_exists', lambda image, registry_auth, scheme='https': True)
+    before = build_plan.plan_builds(str(workspace), 'registry.local/iris', True, {})
+
+    write(workspace / 'components/base/requirements.txt', 'pandas\nxgboost\n')
+    after = build_plan.plan_builds(str(workspace), 'registry.local/iris', True, {})
+
+    for name in build_plan.COMPONENTS:
+        assert after[name]['hash'] != before[name]['hash']
+
+def test_plan_without_base_image(workspace, monkeypatch):
+    monkeypatch.setattr(build_plan, 'image_exists', lambda image, registry_auth, scheme='https': True)
+
+    plan = build_plan.plan_builds(str(workspace), 'registry.local/iris', False, {})
+
+    assert plan['base'] == {'image': build_plan.DEFAULT_BASE_IMAGE, 'hash': '', 'build': False}
+
+@pytest.mark.parametrize('filename', ['config.json', '.dockerconfigjson'])
+def test_load_registry_auth_from_mounted_secret(tmp_path, filename):
+    write(tmp_path / filename, '{"auths": {"https://registry.local:30002/": {"auth": "dXNlcjpwYXNz"}}}')
+
+    auth = build_plan.load_registry_auth(str(tmp_path / 'config.json'))
+
+    assert auth == {'registry.local:30002': 'dXNlcjpwYXNz'}
+
+def test_load_registry_auth_without_config(tmp_path):
+    assert build_plan.load_registry_auth(str(tmp_path / 'config.json')) == {}
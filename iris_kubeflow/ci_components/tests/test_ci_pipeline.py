@@ -0,0 +1,46 @@
+import importlib
+import os
+import sys
+
+import pytest
+import yaml
+
+PIPELINES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'pipelines')
+
+@pytest.fixture
+def compiled(tmp_path, monkeypatch):
+    from kfp import compiler
+
+    # ci_pipeline.py loads the component YAMLs relative to its own directory
+    monkeypatch.chdir(PIPELINES_DIR)
+    monkeypatch.syspath_prepend(PIPELINES_DIR)
+    sys.modules.pop('ci_pipeline', None)
+    ci_pipeline = importlib.import_module('ci_pipeline')
+
+    package_path = tmp_path / 'ci_pipeline_compiled.yaml'
+    compiler.Compiler().compile(pipeline_func=ci_pipeline.ci_pipeline, package_path=str(package_path))
+    with open(package_path) as f:
+        return list(yaml.safe_load_all(f))
+
+def test_ci_pipeline_compiles(compiled):
+    package = compiled[0]
+
+    assert 'namespace' in package['root']['inputDefinitions']['parameters']
+    assert {'exec-git-clone', 'exec-build-plan', 'exec-trigger-iris-pipeline'} <= set(package['deploymentSpec']['executors'])
+
+def test_registry_secret_mounted_for_plan_and_builds(compiled):
+    package, platform = compiled
+    executors = platform['platforms']['kubernetes']['deploymentSpec']['executors']
+
+    kaniko_executors = [name for name in package['deploymentSpec']['executors'] if name.startswith('exec-kaniko-build')]
+    # The base image plus one build per component image
+    assert len(kaniko_executors) == 4
+    for name in ['exec-build-plan'] + kaniko_executors:
+        [volume] = executors[name]['secretAsVolume']
+        assert volume['mountPath'] == '/kaniko/.docker'
+        assert volume['secretNameParameter'] == {'componentInputParameter': 'harbor_secret_name'}
+
+def test_trigger_selects_pipeline_access_poddefault(compiled):
+    executors = compiled[1]['platforms']['kubernetes']['deploymentSpec']['executors']
+
+    assert executors['exec-trigger-iris-pipeline']['podMetadata']['labels'] == {'access-ml-pipeline': 'true'}
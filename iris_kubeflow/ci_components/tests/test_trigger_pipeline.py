@@ -0,0 +1,85 @@
+import json
+import os
+
+import pytest
+import yaml
+
+import trigger_pipeline
+
+PIPELINE_PACKAGE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'pipelines', 'iris_pipeline_compiled.yaml'
+)
+
+IMAGES = {
+    'download': 'registry.local/iris/iris-download:1111',
+    'train': 'registry.local/iris/iris-train:2222',
+    'predict': 'registry.local/iris/iris-predict:3333',
+}
+
+def load_documents(path):
+    with open(path) as f:
+        return list(yaml.safe_load_all(f))
+
+def executor_images(package):
+    return {name: executor['container']['image'] for name, executor in package['deploymentSpec']['executors'].items()}
+
+def test_set_component_images_on_compiled_pipeline():
+    package = load_documents(PIPELINE_PACKAGE)[0]
+
+    images = executor_images(trigger_pipeline.set_component_images(package, IMAGES))
+
+    assert images == {
+        'exec-download-iris-dataset': IMAGES['download'],
+        'exec-train-iris-model': IMAGES['train'],
+        'exec-train-iris-model-2': IMAGES['train'],
+        'exec-predict-iris-species': IMAGES['predict'],
+    }
+
+def test_set_component_images_matches_whole_repository_name():
+    package = {'deploymentSpec': {'executors': {
+        'exec-a': {'container': {'image': 'registry.local/iris/iris-train-extra:v1'}},
+        'exec-b': {'container': {'image': 'registry.local/iris/not-iris-train:v1'}},
+    }}}
+
+    images = executor_images(trigger_pipeline.set_component_images(package, IMAGES))
+
+    assert images == {'exec-a': 'registry.local/iris/iris-train-extra:v1', 'exec-b': 'registry.local/iris/not-iris-train:v1'}
+
+def test_trigger_pipeline_records_local_run(tmp_path):
+    client = trigger_pipeline.LocalKfpClient(str(tmp_path))
+    arguments = {'model_name': 'random_forest', 'early_stopping_rounds': 5}
+
+    run_id = trigger_pipeline.trigger_pipeline(
+        client, PIPELINE_PACKAGE, IMAGES, arguments, 'iris-2222', 'iris-ci', 'user-example-com'
+    )
+
+    documents = load_documents(tmp_path / f'{run_id}.yaml')
+    assert executor_images(documents[0]) == {
+        'exec-download-iris-dataset': IMAGES['download'],
+        'exec-train-iris-model': IMAGES['train'],
+        'exec-train-iris-model-2': IMAGES['train'],
+        'exec-predict-iris-species': IMAGES['predict'],
+    }
+    # The Kubernetes platform spec with the checkpoint volume is passed through
+    assert documents[1:] == load_documents(PIPELINE_PACKAGE)[1:]
+
+    with open(tmp_path / f'{run_id}.json') as f:
+        assert json.load(f) == {
+            'run_name': 'iris-2222',
+            'experiment_name': 'iris-ci',
+            'namespace': 'user-example-com',
+            'arguments': arguments,
+        }
+
+def test_get_client_requires_token_for_namespace(tmp_path, monkeypatch):
+    pytest.importorskip('kfp')
+    monkeypatch.setenv(trigger_pipeline.SA_TOKEN_PATH_ENV, str(tmp_path / 'missing-token'))
+
+    with pytest.raises(FileNotFoundError, match='access-ml-pipeline'):
+        trigger_pipeline.get_client('http://ml-pipeline.kubeflow:8888', str(tmp_path), 'user-example-com')
+
+def test_get_client_local(tmp_path):
+    client = trigger_pipeline.get_client('local', str(tmp_path / 'runs'), 'user-example-com')
+
+    assert isinstance(client, trigger_pipeline.LocalKfpClient)
+    assert os.path.isdir(tmp_path / 'runs')
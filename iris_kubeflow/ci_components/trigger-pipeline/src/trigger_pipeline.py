@@ -0,0 +1,172 @@
+"""
+Submits the Iris ML pipeline with the images produced by the CI pipeline.
+
+The compiled pipeline package is copied with each component executor pointed
+at its new image and submitted through the KFP client. A local stand-in client
+records the submission instead, for dry runs without a KFP endpoint.
+"""
+import argparse
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
+from collections import namedtuple
+
+import yaml
+
+COMPONENTS = ('download', 'train', 'predict')
+DEFAULT_KFP_HOST = 'http://ml-pipeline.kubeflow:8888'
+
+# Projected service account token the access-ml-pipeline PodDefault mounts in
+# multi-user installs; the env var is set by the PodDefault as well
+SA_TOKEN_PATH_ENV = 'KF_PIPELINES_SA_TOKEN_PATH'
+DEFAULT_SA_TOKEN_PATH = '/var/run/secrets/kubeflow/pipelines/token'
+
+# Mirrors the run_id attribute of the result kfp.Client returns
+LocalRunResult = namedtuple('LocalRunResult', ['run_id'])
+
+class LocalKfpClient:
+    """
+    Stand-in for kfp.Client that records runs in a directory instead of submitting them.
+
+    Each run is saved as <run_id>.yaml (the pipeline package) and <run_id>.json
+    (the arguments and target namespace), so a dry run can be inspected without
+    a KFP deployment.
+    """
+
+    def __init__(self, runs_dir: str):
+        self.runs_dir = runs_dir
+        os.makedirs(runs_dir, exist_ok=True)
+
+    def create_run_from_pipeline_package(self, pipeline_file: str, arguments: dict = None,
+                                         run_name: str = None, experiment_name: str = None,
+                                         namespace: str = None):
+        run_id = str(uuid.uuid4())
+        with open(pipeline_file) as src, open(os.path.join(self.runs_dir, f'{run_id}.yaml'), 'w') as dst:
+            dst.write(src.read())
+        with open(os.path.join(self.runs_dir, f'{run_id}.json'), 'w') as f:
+            json.dump({
+                'run_name': run_name,
+                'experiment_name': experiment_name,
+                'namespace': namespace,
+                'arguments': arguments or {},
+            }, f, indent=2)
+        return LocalRunResult(run_id)
+
+def get_client(kfp_host: str, local_runs_dir: str, namespace: str = ''):
+    """
+    Returns a kfp.Client for the host, or the local stand-in when the host is 'local'.
+
+    The client authenticates with the pod's KFP service account token, which a
+    multi-user install requires to submit runs into a profile namespace.
+    """
+    if kfp_host == 'local':
+        return LocalKfpClient(local_runs_dir)
+    import kfp
+    from kfp.client import ServiceAccountTokenVolumeCredentials
+
+    token_path = os.environ.get(SA_TOKEN_PATH_ENV, DEFAULT_SA_TOKEN_PATH)
+    client_kwargs = {'host': kfp_host or DEFAULT_KFP_HOST}
+    if os.path.exists(token_path):
+        client_kwargs['credentials'] = ServiceAccountTokenVolumeCredentials(token_path)
+    elif namespace:
+        raise FileNotFoundError(
+            f"No KFP service account token at {token_path}. Submitting to namespace {namespace} "
+            f"needs the access-ml-pipeline PodDefault, see manifests/kubeflow/access-ml-pipeline-poddefault.yaml."
+        )
+    if namespace:
+        client_kwargs['namespace'] = namespace
+    return kfp.Client(**client_kwargs)
+
+def set_component_images(package: dict, images: dict) -> dict:
+    """Points each executor whose image repository is iris-<component> at the new image."""
+    executors = package['deploymentSpec']['executors']
+    for executor in executors.values():
+        container = executor.get('container', {})
+        repository = container.get('image', '').rsplit(':', 1)[0]
+        for name, image in images.items():
+            if re.search(rf'(^|/)iris-{name}$', repository):
+                container['image'] = image
+    return package
+
+def build_report(plan: dict, build_seconds: dict) -> dict:
+    """Per-image build outcome and duration, plus the planning time."""
+    report = {'plan_seconds': plan.get('plan_seconds'), 'images': {}}
+    for name, entry in plan['images'].items():
+        report['images'][name] = {
+            'image': entry['image'],
+            'hash': entry['hash'],
+            'built': entry['build'],
+            'build_seconds': build_seconds.get(name, 0.0),
+        }
+    return report
+
+def trigger_pipeline(client, pipeline_package_path: str, images: dict, arguments: dict,
+                     run_name: str, experiment_name: str, namespace: str = '') -> str:
+    """Submits the pipeline package with updated images and returns the run ID."""
+    # The first document is the pipeline spec; a second one, if present, holds
+    # Kubernetes platform settings such as volume mounts and is passed through
+    with open(pipeline_package_path) as f:
+        documents = list(yaml.safe_load_all(f))
+    set_component_images(documents[0], images)
+
+    patched_path = os.path.join(tempfile.mkdtemp(), 'iris_pipeline_ci.yaml')
+    with open(patched_path, 'w') as f:
+        yaml.safe_dump_all(documents, f, sort_keys=False)
+
+    result = client.create_run_from_pipeline_package(
+        patched_path, arguments=arguments, run_name=run_name, experiment_name=experiment_name,
+        namespace=namespace or None
+    )
+    return result.run_id
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Trigger the Iris ML pipeline with freshly built images.')
+    parser.add_argument('--pipeline_package', type=str, required=True, help='Path to the compiled Iris pipeline YAML.')
+    parser.add_argument('--plan_path', type=str, required=True, help='Build plan JSON written by build_plan.py.')
+    for name in COMPONENTS + ('base',):
+        parser.add_argument(f'--{name}_build_seconds', type=float, default=0.0, help=f'Duration of the {name} image build.')
+    parser.add_argument('--kfp_host', type=str, default='', help=f"KFP API endpoint (default {DEFAULT_KFP_HOST}), or 'local' to record the run instead.")
+    parser.add_argument('--local_runs_dir', type=str, default='/tmp/kfp-local-runs', help='Where the local client records runs.')
+    parser.add_argument('--experiment_name', type=str, default='iris-ci', help='KFP experiment for the run.')
+    parser.add_argument('--namespace', type=str, default='', help='Kubeflow profile namespace to run in. Required for multi-user installs.')
+    parser.add_argument('--run_name', type=str, default='', help='Name of the run. Defaults to one derived from the train image tag.')
+    parser.add_argument('--pipeline_arguments', type=str, default='{}', help='JSON string of arguments for the Iris pipeline.')
+    parser.add_argument('--run_id_output_path', type=str, default=None, help='Path to save the submitted run ID.')
+    parser.add_argument('--report_output_path', type=str, default=None, help='Path to save the build and trigger report as JSON.')
+
+    args = parser.parse_args()
+
+    with open(args.plan_path) as f:
+        plan = json.load(f)
+    images = {name: plan['images'][name]['image'] for name in COMPONENTS}
+    build_seconds = {name: getattr(args, f'{name}_build_seconds') for name in COMPONENTS + ('base',)}
+
+    start = time.perf_counter()
+    run_id = trigger_pipeline(
+        get_client(args.kfp_host, args.local_runs_dir, args.namespace),
+        args.pipeline_package,
+        images,
+        json.loads(args.pipeline_arguments or '{}'),
+        args.run_name or f"iris-{images['train'].rsplit(':', 1)[-1]}",
+        args.experiment_name,
+        args.namespace,
+    )
+    trigger_seconds = round(time.perf_counter() - start, 3)
+    print(f"Triggered run {run_id} with images: {images}")
+
+    report = build_report(plan, build_seconds)
+    report['trigger_seconds'] = trigger_seconds
+    report['run_id'] = run_id
+    print(json.dumps(report, indent=2))
+
+    if args.run_id_output_path:
+        os.makedirs(os.path.dirname(args.run_id_output_path) or '.', exist_ok=True)
+        with open(args.run_id_output_path, 'w') as f:
+            f.write(run_id)
+    if args.report_output_path:
+        os.makedirs(os.path.dirname(args.report_output_path) or '.', exist_ok=True)
+        with open(args.report_output_path, 'w') as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,148 @@
+"""
+Structured, non-blocking logging shared by the pipeline components and the server
+
+Records are formatted as one JSON object per line by a background thread, so
+callers only pay for putting the record on a bounded queue. When the queue is
+full records are dropped and counted instead of blocking the caller.
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+from contextlib import contextmanager
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record and its ``extra`` fields as a single JSON line"""
+
+    def format(self, record):
+        doc = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        doc.update((k, v) for k, v in record.__dict__.items() if k not in _RECORD_ATTRIBUTES)
+        if record.exc_info:
+            doc['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            doc['exc_info'] = record.exc_text
+        return json.dumps(doc, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of raising"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Merge args and render the traceback now, but leave the message
+        # unformatted so the listener can emit it as JSON
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class SamplingFilter(logging.Filter):
+    """Passes each record with probability ``rate``"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return self.rate >= 1 or random.random() < self.rate
+
+
+def setup_logging(level=None, max_queue_size=10000):
+    """
+    Route the root logger through a bounded queue drained by a background thread
+
+    The level defaults to the LOG_LEVEL environment variable (INFO if unset).
+    Safe to call more than once; only the first call configures logging.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.Queue(maxsize=max_queue_size)
+    root = logging.getLogger()
+    root.handlers = [DroppingQueueHandler(log_queue)]
+    root.setLevel(level or os.environ.get('LOG_LEVEL', 'INFO'))
+
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the background thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def default_sample_rate():
+    """Sampling rate for per-sample records, from LOG_SAMPLE_RATE (0.01 if unset)"""
+    return float(os.environ.get('LOG_SAMPLE_RATE', '0.01'))
+
+
+def sample_indices(n, rate=None):
+    """
+    Indices of the items in a batch of ``n`` to log individually
+
+    Picks about ``n * rate`` indices up front, so unsampled items cost nothing.
+    """
+    if rate is None:
+        rate = default_sample_rate()
+    expected = n * min(max(rate, 0.0), 1.0)
+    k = int(expected) + (random.random() < expected - int(expected))
+    return sorted(random.sample(range(n), min(k, n)))
+
+
+def get_sampled_logger(name, rate=None):
+    """Logger for high-volume per-request records, passing only a fraction of them"""
+    if rate is None:
+        rate = default_sample_rate()
+
+    logger = logging.getLogger(name)
+    logger.filters = [f for f in logger.filters if not isinstance(f, SamplingFilter)]
+    logger.addFilter(SamplingFilter(rate))
+    return logger
+
+
+@contextmanager
+def timer(timings, name):
+    """Record the wall time of the block in milliseconds as ``timings[name]``"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = round((time.perf_counter() - start) * 1000, 3)
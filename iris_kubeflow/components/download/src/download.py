@@ -1,27 +1,35 @@
-
 import pandas as pd
 from sklearn.datasets import load_iris
 import argparse
+import logging
 import os
 
+from structured_logging import setup_logging, timer
+
+logger = logging.getLogger('iris.download')
+
 def download_data(output_path):
     """Loads the Iris dataset and saves it to a CSV file."""
-    print("Loading Iris dataset...")
-    iris = load_iris()
-    
-    df = pd.DataFrame(data=iris.data, columns=iris.feature_names)
-    df['target'] = iris.target
-    
+    timings = {}
+
+    logger.info("Loading Iris dataset...")
+    with timer(timings, 'load_ms'):
+        iris = load_iris()
+
+        df = pd.DataFrame(data=iris.data, columns=iris.feature_names)
+        df['target'] = iris.target
+
     # Create the directory if it doesn't exist
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
-    print(f"Saving data to {output_path}")
-    df.to_csv(output_path, index=False)
-    print("Data saved successfully.")
+
+    with timer(timings, 'save_ms'):
+        df.to_csv(output_path, index=False)
+    logger.info("Data saved successfully.", extra={'output_path': output_path, 'rows': len(df), **timings})
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Download Iris dataset.')
     parser.add_argument('--output_path', type=str, required=True, help='Path to save the downloaded data.')
     args = parser.parse_args()
-    
+
+    setup_logging()
     download_data(args.output_path)
@@ -1,44 +1,88 @@
-
-import pandas as pd
+import numpy as np
 import pickle
 import argparse
+import json
+import logging
+import os
+
+from structured_logging import sample_indices, setup_logging, timer
+
+logger = logging.getLogger('iris.predict')
+
+def summarize_predictions(predictions, prediction_proba) -> dict:
+    """Per-class counts and confidence statistics for a batch of predictions."""
+    classes, counts = np.unique(predictions, return_counts=True)
+    confidence = prediction_proba.max(axis=1)
+    return {
+        'n_samples': int(len(predictions)),
+        'class_counts': {str(c): int(n) for c, n in zip(classes.tolist(), counts.tolist())},
+        'mean_confidence': float(confidence.mean()),
+        'min_confidence': float(confidence.min()),
+    }
+
+def write_predictions(predictions_output_path: str, summary: dict, timings: dict, predictions: list, probabilities: list):
+    """Writes the per-sample results and their summary as the predictions artifact."""
+    os.makedirs(os.path.dirname(predictions_output_path) or '.', exist_ok=True)
+    with open(predictions_output_path, 'w') as f:
+        json.dump({
+            'summary': summary,
+            'timings': timings,
+            'predictions': predictions,
+            'probabilities': probabilities,
+        }, f)
+    logger.info("Predictions saved successfully.", extra={'predictions_output_path': predictions_output_path})
+
+def make_predictions(model_path: str, input_data_str: str, predictions_output_path: str = None):
+    """Loads a model, makes predictions on sample data and writes a summary artifact."""
+    timings = {}
 
-def make_predictions(model_path: str, input_data_str: str):
-    """Loads a model and makes predictions on sample data."""
-    print("Loading model...")
-    with open(model_path, 'rb') as f:
-        model = pickle.load(f)
-    print("Model loaded.")
+    logger.info("Loading model...", extra={'model_path': model_path})
+    with timer(timings, 'load_ms'):
+        with open(model_path, 'rb') as f:
+            model = pickle.load(f)
 
     # The input data is passed as a string, e.g., "5.1,3.5,1.4,0.2;6.7,3.0,5.2,2.3"
     # We need to parse it into a list of lists of floats.
-    print(f"Parsing input data: {input_data_str}")
-    samples_str = input_data_str.strip().split(';')
-    samples = [[float(v) for v in s.split(',')] for s in samples_str if s]
-    
+    with timer(timings, 'parse_ms'):
+        samples_str = input_data_str.strip().split(';')
+        samples = [[float(v) for v in s.split(',')] for s in samples_str if s]
+
     if not samples:
-        print("No valid data provided for prediction.")
+        logger.warning("No valid data provided for prediction.")
+        # The predictions output is declared, so KFP fails the task if it is missing
+        if predictions_output_path:
+            empty_summary = {'n_samples': 0, 'class_counts': {}, 'mean_confidence': None, 'min_confidence': None}
+            write_predictions(predictions_output_path, empty_summary, timings, [], [])
         return
 
-    print(f"Making predictions on {len(samples)} samples...")
-    predictions = model.predict(samples)
-    prediction_proba = model.predict_proba(samples)
-    
-    # In a real Kubeflow component, you would save this to a file.
-    # For this example, we'll just print the results.
-    print("\nPredictions:")
-    for i, (sample, pred, proba) in enumerate(zip(samples, predictions, prediction_proba)):
-        print(f"Sample {i+1}: {sample}")
-        print(f"  -> Predicted class: {pred}")
-        print(f"  -> Probabilities: {proba.tolist()}")
-        print("-" * 20)
+    with timer(timings, 'predict_ms'):
+        predictions = model.predict(samples)
+        prediction_proba = model.predict_proba(samples)
+
+    summary = summarize_predictions(predictions, prediction_proba)
+    logger.info("Predictions complete.", extra={**summary, **timings})
+
+    # Only a sample of the per-sample records reaches the log store
+    for i in sample_indices(len(samples)):
+        logger.info("Sample prediction", extra={
+            'sample_index': i,
+            'sample': samples[i],
+            'predicted_class': int(predictions[i]),
+            'probabilities': prediction_proba[i].tolist(),
+        })
+
+    # The full per-sample results go to the artifact instead of the logs
+    if predictions_output_path:
+        write_predictions(predictions_output_path, summary, timings, predictions.tolist(), prediction_proba.tolist())
 
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Make predictions with a trained model.')
     parser.add_argument('--model_path', type=str, required=True, help='Path to the trained model.')
     parser.add_argument('--input_data', type=str, required=True, help='Semicolon-separated list of comma-separated feature vectors.')
-    
+    parser.add_argument('--predictions_output_path', type=str, default=None, help='Path to save the predictions and their summary as JSON.')
+
     args = parser.parse_args()
-    
-    make_predictions(args.model_path, args.input_data)
+
+    setup_logging()
+    make_predictions(args.model_path, args.input_data, args.predictions_output_path)
@@ -0,0 +1,9 @@
+import os
+import sys
+
+IRIS_KUBEFLOW_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The component images copy src/ and common/structured_logging.py into one
+# working directory, so make both importable the same way here
+sys.path.insert(0, os.path.join(IRIS_KUBEFLOW_DIR, 'common'))
+sys.path.insert(0, os.path.join(IRIS_KUBEFLOW_DIR, 'components', 'train', 'src'))
@@ -0,0 +1,127 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+from sklearn.datasets import load_iris
+
+import checkpoint
+import train
+
+N_ESTIMATORS = 40
+INTERRUPT_AT = 20
+
+class Interrupted(Exception):
+    pass
+
+class InterruptingCheckpoint(checkpoint.BoostingCheckpoint):
+    """Saves like BoostingCheckpoint, then kills training as a preempted pod would."""
+
+    def after_iteration(self, model, epoch, evals_log):
+        super().after_iteration(model, epoch, evals_log)
+        if model.num_boosted_rounds() == INTERRUPT_AT:
+            raise Interrupted()
+        return False
+
+@pytest.fixture(scope='module')
+def iris():
+    data = load_iris(as_frame=True)
+    return data.data, data.target
+
+def new_model(**params):
+    return xgb.XGBClassifier(n_estimators=N_ESTIMATORS, max_depth=3, objective='multi:softprob',
+                             eval_metric='mlogloss', random_state=42, **params)
+
+def run_dirs(checkpoint_dir):
+    return [os.path.join(checkpoint_dir, name) for name in os.listdir(checkpoint_dir)]
+
+def assert_same_booster(a, b, X):
+    assert a.get_booster().get_dump() == b.get_booster().get_dump()
+    np.testing.assert_array_equal(a.predict_proba(X), b.predict_proba(X))
+
+def interrupt_training(monkeypatch, X, y, checkpoint_dir, **kwargs):
+    with monkeypatch.context() as m:
+        m.setattr(train, 'BoostingCheckpoint', InterruptingCheckpoint)
+        with pytest.raises(Interrupted):
+            train.fit_xgboost(new_model(), X, y, checkpoint_dir, checkpoint_interval=10, **kwargs)
+
+def test_resumed_run_matches_uninterrupted_run(iris, tmp_path, monkeypatch):
+    X, y = iris
+    expected = train.fit_xgboost(new_model(), X, y)
+
+    interrupt_training(monkeypatch, X, y, str(tmp_path))
+    [run_dir] = run_dirs(str(tmp_path))
+    assert checkpoint.read_metadata(run_dir)['completed'] is False
+    assert checkpoint.latest_checkpoint(run_dir).endswith(f'checkpoint_{INTERRUPT_AT:06d}.json')
+
+    resumed = train.fit_xgboost(new_model(), X, y, str(tmp_path), checkpoint_interval=10)
+
+    assert resumed.get_booster().num_boosted_rounds() == N_ESTIMATORS
+    assert resumed.get_params()['n_estimators'] == N_ESTIMATORS
+    assert resumed.get_params()['callbacks'] is None
+    assert checkpoint.read_metadata(run_dir)['completed'] is True
+    assert_same_booster(resumed, expected, X)
+
+def test_completed_run_is_reloaded_without_training(iris, tmp_path, monkeypatch):
+    X, y = iris
+    first = train.fit_xgboost(new_model(), X, y, str(tmp_path))
+
+    def fail_fit(*args, **kwargs):
+        raise AssertionError('a completed run must not be trained again')
+    monkeypatch.setattr(xgb.XGBClassifier, 'fit', fail_fit)
+    reloaded = train.fit_xgboost(new_model(), X, y, str(tmp_path))
+
+    assert_same_booster(reloaded, first, X)
+
+def test_early_stopped_run_is_not_boosted_further(iris, tmp_path):
+    X, y = iris
+    model = new_model(learning_rate=1.0)
+    first = train.fit_xgboost(model, X, y, str(tmp_path), early_stopping_rounds=2, validation_fraction=0.3)
+    stopped_rounds = first.get_booster().num_boosted_rounds()
+    assert stopped_rounds < N_ESTIMATORS
+
+    reloaded = train.fit_xgboost(new_model(learning_rate=1.0), X, y, str(tmp_path),
+                                 early_stopping_rounds=2, validation_fraction=0.3)
+
+    assert reloaded.get_booster().num_boosted_rounds() == stopped_rounds
+    assert reloaded.best_iteration == first.best_iteration
+
+@pytest.mark.parametrize('change', ['hyperparameters', 'data', 'n_estimators', 'early_stopping'])
+def test_different_runs_do_not_share_checkpoints(iris, tmp_path, monkeypatch, change):
+    X, y = iris
+    interrupt_training(monkeypatch, X, y, str(tmp_path))
+
+    model, fit_kwargs = new_model(), {}
+    if change == 'hyperparameters':
+        model = new_model(learning_rate=0.1)
+    elif change == 'data':
+        X = X.assign(**{X.columns[0]: X.iloc[:, 0] + 0.1})
+    elif change == 'n_estimators':
+        model.set_params(n_estimators=N_ESTIMATORS + 10)
+    else:
+        fit_kwargs = {'early_stopping_rounds': 5}
+    expected = train.fit_xgboost(model.__class__(**model.get_params()), X, y, **fit_kwargs)
+
+    fitted = train.fit_xgboost(model, X, y, str(tmp_path), **fit_kwargs)
+
+    assert len(run_dirs(str(tmp_path))) == 2
+    assert_same_booster(fitted, expected, X)
+
+def test_checkpoints_without_matching_metadata_are_discarded(iris, tmp_path, monkeypatch):
+    X, y = iris
+    interrupt_training(monkeypatch, X, y, str(tmp_path))
+    [run_dir] = run_dirs(str(tmp_path))
+    checkpoint.write_metadata(run_dir, {'fingerprint': 'something-else'})
+
+    fitted = train.fit_xgboost(new_model(), X, y, str(tmp_path))
+
+    assert_same_booster(fitted, train.fit_xgboost(new_model(), X, y), X)
+    assert checkpoint.read_metadata(run_dir)['completed'] is True
+
+def test_fingerprint_covers_labels(iris):
+    X, y = iris
+    params = new_model().get_params()
+
+    assert checkpoint.training_fingerprint(params, X, y) == checkpoint.training_fingerprint(params, X.copy(), y.copy())
+    assert checkpoint.training_fingerprint(params, X, y) != checkpoint.training_fingerprint(params, X, pd.Series(y[::-1].to_numpy()))
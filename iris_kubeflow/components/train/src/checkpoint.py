@@ -0,0 +1,96 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import uuid
+
+import pandas as pd
+import xgboost as xgb
+
+logger = logging.getLogger('iris.train.checkpoint')
+
+CHECKPOINT_PATTERN = re.compile(r'^checkpoint_(\d+)\.json$')
+METADATA_FILENAME = 'metadata.json'
+FINGERPRINT_LENGTH = 16
+
+def training_fingerprint(params: dict, X: pd.DataFrame, y: pd.Series) -> str:
+    """Hashes the training configuration and data, so only an identical run reuses a checkpoint."""
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode())
+    digest.update(pd.util.hash_pandas_object(X).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(y).to_numpy().tobytes())
+    return digest.hexdigest()[:FINGERPRINT_LENGTH]
+
+def read_metadata(checkpoint_dir: str) -> dict:
+    """Returns the metadata saved with the checkpoints in the directory, or an empty dict."""
+    path = os.path.join(checkpoint_dir, METADATA_FILENAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def write_metadata(checkpoint_dir: str, metadata: dict):
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    tmp_path = os.path.join(checkpoint_dir, f'.{METADATA_FILENAME}.{uuid.uuid4().hex}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(tmp_path, os.path.join(checkpoint_dir, METADATA_FILENAME))
+
+def checkpoint_path(checkpoint_dir: str, rounds: int) -> str:
+    return os.path.join(checkpoint_dir, f'checkpoint_{rounds:06d}.json')
+
+def list_checkpoints(checkpoint_dir: str) -> list:
+    """Returns (rounds, path) for every checkpoint in the directory, oldest first."""
+    if not os.path.isdir(checkpoint_dir):
+        return []
+    checkpoints = []
+    for name in os.listdir(checkpoint_dir):
+        match = CHECKPOINT_PATTERN.match(name)
+        if match:
+            checkpoints.append((int(match.group(1)), os.path.join(checkpoint_dir, name)))
+    return sorted(checkpoints)
+
+def latest_checkpoint(checkpoint_dir: str):
+    """Returns the path of the checkpoint with the most boosting rounds, or None."""
+    checkpoints = list_checkpoints(checkpoint_dir)
+    return checkpoints[-1][1] if checkpoints else None
+
+class BoostingCheckpoint(xgb.callback.TrainingCallback):
+    """
+    Saves the booster every `interval` boosting rounds so a preempted run can resume.
+
+    Checkpoints are named after the total number of rounds in the booster, which
+    stays correct across resumes, and are written to a temporary file first so a
+    pod killed mid-write never leaves a truncated latest checkpoint behind.
+    """
+
+    def __init__(self, checkpoint_dir: str, interval: int = 10, keep: int = 2):
+        super().__init__()
+        self.checkpoint_dir = checkpoint_dir
+        self.interval = max(interval, 1)
+        self.keep = max(keep, 1)
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+    def after_iteration(self, model, epoch, evals_log):
+        rounds = model.num_boosted_rounds()
+        if rounds % self.interval == 0:
+            self.save(model, rounds)
+        return False
+
+    def after_training(self, model):
+        self.save(model, model.num_boosted_rounds())
+        return model
+
+    def save(self, booster, rounds: int):
+        path = checkpoint_path(self.checkpoint_dir, rounds)
+        # Unique temporary name, as runs with the same fingerprint may share the directory
+        tmp_path = os.path.join(self.checkpoint_dir, f'.checkpoint_{rounds:06d}.{uuid.uuid4().hex}.tmp.json')
+        booster.save_model(tmp_path)
+        os.replace(tmp_path, path)
+        logger.info("Checkpoint saved.", extra={'checkpoint_path': path, 'boosted_rounds': rounds})
+
+        for _, old_path in list_checkpoints(self.checkpoint_dir)[:-self.keep]:
+            try:
+                os.remove(old_path)
+            except FileNotFoundError:
+                pass
@@ -1,18 +1,136 @@
 
+import numpy as np
 import pandas as pd
 import xgboost as xgb
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
 import argparse
+import logging
 import pickle
 import os
 import json
 
-def train_model(data_path: str, model_output_path: str, model_name: str, model_hyperparameters: str):
-    """Loads data, trains a specified model, and saves it."""
-    print("Loading data...")
-    df = pd.read_csv(data_path)
+from checkpoint import (BoostingCheckpoint, latest_checkpoint, list_checkpoints,
+                        read_metadata, training_fingerprint, write_metadata)
+from structured_logging import setup_logging, timer
+
+logger = logging.getLogger('iris.train')
+
+PROFILE_BINS = 10
+XGB_DEFAULT_N_ESTIMATORS = 100
+
+def build_feature_schema(X: pd.DataFrame) -> dict:
+    """Records column order, dtype and per-feature min/max of the training features."""
+    return {
+        'feature_names': list(X.columns),
+        'dtype': 'float64',
+        'min': X.min().astype(float).tolist(),
+        'max': X.max().astype(float).tolist(),
+    }
+
+def build_reference_profile(X: pd.DataFrame, n_bins: int = PROFILE_BINS) -> dict:
+    """
+    Records per-feature mean, variance and a fixed-bin histogram of the training features.
+
+    Bins are uniform between each feature's min and max, with an extra underflow
+    and overflow bin on either side so serving can count out-of-range traffic.
+    """
+    values = X.to_numpy(dtype=np.float64)
+    bin_edges = np.linspace(values.min(axis=0), values.max(axis=0), n_bins + 1, axis=1)
+    bin_counts = [
+        [0] + np.histogram(values[:, i], bins=bin_edges[i])[0].tolist() + [0]
+        for i in range(values.shape[1])
+    ]
+    return {
+        'feature_names': list(X.columns),
+        'count': int(values.shape[0]),
+        'mean': values.mean(axis=0).tolist(),
+        'var': values.var(axis=0, ddof=1).tolist(),
+        'bin_edges': bin_edges.tolist(),
+        'bin_counts': bin_counts,
+    }
+
+def fit_xgboost(model: xgb.XGBClassifier, X_train: pd.DataFrame, y_train: pd.Series,
+                checkpoint_dir: str = None, checkpoint_interval: int = 10,
+                early_stopping_rounds: int = 0, validation_fraction: float = 0.1) -> xgb.XGBClassifier:
+    """
+    Fits an XGBoost model with optional boosting-round checkpoints and early stopping.
+
+    Checkpoints live in a subdirectory of checkpoint_dir named after a fingerprint
+    of the hyperparameters, training data and early stopping settings, next to a
+    metadata file recording that fingerprint. Training resumes only from a
+    checkpoint whose metadata matches, boosting the remaining rounds up to
+    n_estimators. Early stopping monitors a validation split held out from the
+    training data, so the test set stays unseen.
+    """
+    n_estimators = model.get_params().get('n_estimators') or XGB_DEFAULT_N_ESTIMATORS
+    fit_params = {'verbose': False}
+
+    if checkpoint_dir:
+        run_params = {
+            **model.get_params(),
+            'n_estimators': n_estimators,
+            'early_stopping_rounds': early_stopping_rounds,
+            'validation_fraction': validation_fraction,
+        }
+        fingerprint = training_fingerprint(run_params, X_train, y_train)
+        run_dir = os.path.join(checkpoint_dir, fingerprint)
+        metadata = read_metadata(run_dir)
+
+    if early_stopping_rounds:
+        X_train, X_val, y_train, y_val = train_test_split(
+            X_train, y_train, test_size=validation_fraction, random_state=42, stratify=y_train
+        )
+        model.set_params(early_stopping_rounds=early_stopping_rounds)
+        fit_params['eval_set'] = [(X_val, y_val)]
+
+    if checkpoint_dir:
+        resume_path = latest_checkpoint(run_dir) if metadata.get('fingerprint') == fingerprint else None
+        if resume_path:
+            booster = xgb.Booster()
+            booster.load_model(resume_path)
+            completed_rounds = booster.num_boosted_rounds()
+            logger.info("Resuming from checkpoint.", extra={'checkpoint_path': resume_path, 'boosted_rounds': completed_rounds})
+
+            # An early-stopped run finishes below n_estimators and must not be boosted further
+            if metadata.get('completed') or completed_rounds >= n_estimators:
+                model.load_model(resume_path)
+                return model
+
+            model.set_params(n_estimators=n_estimators - completed_rounds)
+            fit_params['xgb_model'] = booster
+        else:
+            # Checkpoints without matching metadata come from an unknown run and are never resumed
+            for _, stale_path in list_checkpoints(run_dir):
+                os.remove(stale_path)
+            metadata = {'fingerprint': fingerprint, 'n_estimators': n_estimators, 'completed': False}
+            write_metadata(run_dir, metadata)
+
+        model.set_params(callbacks=[BoostingCheckpoint(run_dir, checkpoint_interval)])
+
+    model.fit(X_train, y_train, **fit_params)
+
+    # Restore the total round count and drop the callback so it is not pickled with the model
+    model.set_params(n_estimators=n_estimators, callbacks=None)
+    if checkpoint_dir:
+        write_metadata(run_dir, {**metadata, 'completed': True})
+    if early_stopping_rounds:
+        logger.info("Early stopping finished.", extra={
+            'best_iteration': model.best_iteration, 'boosted_rounds': model.get_booster().num_boosted_rounds()
+        })
+    return model
+
+def train_model(data_path: str, model_output_path: str, schema_output_path: str,
+                profile_output_path: str, model_name: str, model_hyperparameters: str,
+                checkpoint_dir: str = None, checkpoint_interval: int = 10,
+                early_stopping_rounds: int = 0, validation_fraction: float = 0.1):
+    """Loads data, trains a specified model, and saves it alongside its feature schema and reference profile."""
+    timings = {}
+
+    logger.info("Loading data...", extra={'data_path': data_path})
+    with timer(timings, 'load_ms'):
+        df = pd.read_csv(data_path)
     
     X = df.drop('target', axis=1)
     y = df['target']
@@ -21,16 +139,14 @@ def train_model(data_path: str, model_output_path: str, model_name: str, model_h
         X, y, test_size=0.2, random_state=42, stratify=y
     )
     
-    print(f"Training {model_name} model...")
-    
     # Parse the hyperparameter JSON string
     try:
         hyperparameters = json.loads(model_hyperparameters)
     except (json.JSONDecodeError, TypeError):
-        print(f"Invalid or empty JSON for hyperparameters. Using default parameters for {model_name}.")
+        logger.warning(f"Invalid or empty JSON for hyperparameters. Using default parameters for {model_name}.")
         hyperparameters = {}
 
-    print(f"Using hyperparameters: {hyperparameters}")
+    logger.info(f"Training {model_name} model...", extra={'model_name': model_name, 'hyperparameters': hyperparameters})
 
     # Select and instantiate the model
     if model_name == 'random_forest':
@@ -45,17 +161,40 @@ def train_model(data_path: str, model_output_path: str, model_name: str, model_h
     else:
         raise ValueError(f"Unsupported model_name: {model_name}. Supported options are 'xgboost', 'random_forest', 'logistic_regression'.")
 
-    model.fit(X_train, y_train)
-    
-    print(f"Model trained. Accuracy: {model.score(X_test, y_test):.4f}")
+    if model_name != 'xgboost' and (checkpoint_dir or early_stopping_rounds):
+        logger.warning(f"Checkpointing and early stopping are only supported for xgboost, ignoring them for {model_name}.")
+
+    with timer(timings, 'fit_ms'):
+        if model_name == 'xgboost':
+            model = fit_xgboost(model, X_train, y_train, checkpoint_dir, checkpoint_interval,
+                                early_stopping_rounds, validation_fraction)
+        else:
+            model.fit(X_train, y_train)
+
+    with timer(timings, 'score_ms'):
+        accuracy = model.score(X_test, y_test)
+    logger.info(f"Model trained. Accuracy: {accuracy:.4f}", extra={'accuracy': accuracy, **timings})
     
     # Create the directory if it doesn't exist
     os.makedirs(os.path.dirname(model_output_path), exist_ok=True)
     
-    print(f"Saving model to {model_output_path}")
-    with open(model_output_path, 'wb') as f:
-        pickle.dump(model, f)
-    print("Model saved successfully.")
+    with timer(timings, 'save_ms'):
+        with open(model_output_path, 'wb') as f:
+            pickle.dump(model, f)
+    logger.info("Model saved successfully.", extra={'model_output_path': model_output_path, 'save_ms': timings['save_ms']})
+
+    # The schema is its own pipeline output, so KFP uploads it to the same execution
+    # directory as the model and KServe downloads both
+    os.makedirs(os.path.dirname(schema_output_path), exist_ok=True)
+    with open(schema_output_path, 'w') as f:
+        json.dump(build_feature_schema(X_train), f, indent=2)
+    logger.info("Feature schema saved successfully.", extra={'schema_output_path': schema_output_path})
+
+    # The reference profile is what serving compares live traffic against for drift
+    os.makedirs(os.path.dirname(profile_output_path), exist_ok=True)
+    with open(profile_output_path, 'w') as f:
+        json.dump(build_reference_profile(X_train), f, indent=2)
+    logger.info("Reference profile saved successfully.", extra={'profile_output_path': profile_output_path})
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Train a machine learning model.')
@@ -63,7 +202,17 @@ if __name__ == '__main__':
     parser.add_argument('--model_output_path', type=str, required=True, help='Path to save the trained model.')
     parser.add_argument('--model-name', type=str, default='xgboost', help="The name of the model to train (e.g., 'xgboost', 'random_forest', 'logistic_regression').")
     parser.add_argument('--model-hyperparameters', type=str, default='{}', help="JSON string of hyperparameters for the model.")
+    parser.add_argument('--schema_output_path', type=str, required=True, help='Path to save the feature schema.')
+    parser.add_argument('--profile_output_path', type=str, required=True, help='Path to save the drift reference profile.')
+    parser.add_argument('--checkpoint_dir', type=str, default=None, help="Directory for xgboost boosting-round checkpoints. Training resumes from the latest one saved by a run with the same hyperparameters and data.")
+    parser.add_argument('--checkpoint_interval', type=int, default=10, help="Number of boosting rounds between checkpoints.")
+    parser.add_argument('--early_stopping_rounds', type=int, default=0, help="Stop xgboost training after this many rounds without improvement on a held-out validation split. 0 disables early stopping.")
+    parser.add_argument('--validation_fraction', type=float, default=0.1, help="Fraction of the training data held out for early stopping.")
     
     args = parser.parse_args()
     
-    train_model(args.data_path, args.model_output_path, args.model_name, args.model_hyperparameters)
+    setup_logging()
+    train_model(args.data_path, args.model_output_path, args.schema_output_path, args.profile_output_path,
+                args.model_name, args.model_hyperparameters,
+                args.checkpoint_dir or None, args.checkpoint_interval,
+                args.early_stopping_rounds, args.validation_fraction)
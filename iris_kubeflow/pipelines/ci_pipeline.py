@@ -1,9 +1,16 @@
 from kfp import dsl
-from kfp.v2 import compiler
+from kfp import components
+from kfp import kubernetes
+from kfp import compiler
 
-# Define the paths to your component YAML files
+# Define the paths to your component YAML files, relative to this directory
 GIT_CLONE_COMPONENT_YAML = '../ci_components/git-clone/component.yaml'
+BUILD_PLAN_COMPONENT_YAML = '../ci_components/build-plan/component.yaml'
 KANIKO_COMPONENT_YAML = '../ci_components/kaniko/component.yaml'
+TRIGGER_PIPELINE_COMPONENT_YAML = '../ci_components/trigger-pipeline/component.yaml'
+
+# Where Kaniko, and the build plan's registry checks, read the registry credentials
+DOCKER_CONFIG_MOUNT_PATH = '/kaniko/.docker'
 
 @dsl.pipeline(
     name='ci-pipeline-for-iris-classifier',
@@ -13,69 +20,110 @@ def ci_pipeline(
     # --- Parameters for CI/CD ---
     git_repo_url: str = 'https://github.com/your-username/your-repo.git', # CHANGE_ME
     git_commit_sha: str = 'main', # The Git commit to build
-    
+
     # --- Harbor Registry Details ---
     # Example: 'myharbor.domain/my-project'
     harbor_repo_prefix: str = 'myharbor.domain/my-project', # CHANGE_ME
-    harbor_secret_name: str = 'harbor-credentials' # The name of the k8s secret for Harbor auth
+    harbor_secret_name: str = 'harbor-credentials', # The name of the k8s secret for Harbor auth, mounted at /kaniko/.docker
+    insecure_registry: str = 'false', # 'true' for a plain HTTP registry such as the local Harbor
+
+    # --- Build Options ---
+    use_base_image: str = 'false', # 'true' to install shared dependencies once in an iris-base image
+    cache_repo: str = '', # Kaniko layer cache, e.g. 'myharbor.domain/my-project/kaniko-cache'. Empty disables it
+    force_rebuild: str = 'false', # 'true' to rebuild images even if their content hash is unchanged
+
+    # --- ML Pipeline Trigger ---
+    kfp_host: str = '', # Empty uses the in-cluster KFP API, 'local' records the run without submitting it
+    experiment_name: str = 'iris-ci',
+    namespace: str = 'user-example-com', # Kubeflow profile namespace the Iris pipeline runs in. Empty for single-user installs
+    pipeline_arguments: str = '{}' # JSON arguments for the Iris pipeline
 ):
     """
     This pipeline automates the build and deployment of the Iris ML pipeline.
+
+    Images are tagged with a hash of their Dockerfile, requirements, source and
+    the shared common/ modules, so components whose inputs did not change since
+    the last push are not rebuilt.
     """
     # 1. Load component definitions
-    git_clone_op = dsl.load_component_from_file(GIT_CLONE_COMPONENT_YAML)
-    kaniko_op = dsl.load_component_from_file(KANIKO_COMPONENT_YAML)
+    git_clone_op = components.load_component_from_file(GIT_CLONE_COMPONENT_YAML)
+    build_plan_op = components.load_component_from_file(BUILD_PLAN_COMPONENT_YAML)
+    kaniko_op = components.load_component_from_file(KANIKO_COMPONENT_YAML)
+    trigger_pipeline_op = components.load_component_from_file(TRIGGER_PIPELINE_COMPONENT_YAML)
 
     # 2. Clone the specified commit from the repository
     clone_task = git_clone_op(
         repo_url=git_repo_url,
         commit_sha=git_commit_sha
     )
-    
-    # Define the image names and context paths
+
+    # 3. Hash each image's inputs and check which tags already exist in Harbor
+    plan_task = build_plan_op(
+        workspace=clone_task.outputs['workspace'],
+        image_prefix=harbor_repo_prefix,
+        use_base_image=use_base_image,
+        force_rebuild=force_rebuild,
+        insecure_registry=insecure_registry
+    )
+    # Registry credentials for the manifest checks, at the same path Kaniko uses
+    kubernetes.use_secret_as_volume(plan_task, secret_name=harbor_secret_name, mount_path=DOCKER_CONFIG_MOUNT_PATH)
+
+    # Define the Dockerfile paths. The build context is the iris_kubeflow/
+    # directory so images can include the shared common/ modules.
+    build_context_path = 'iris_kubeflow'
     components_to_build = {
-        'download': 'components/download',
-        'train': 'components/train',
-        'predict': 'components/predict'
+        'download': 'components/download/Dockerfile',
+        'train': 'components/train/Dockerfile',
+        'predict': 'components/predict/Dockerfile'
     }
 
-    # 3. Build all component images in parallel using Kaniko
+    # 4. Build the shared base image first. It is skipped when base image mode
+    # is off or when the base image is already up to date.
+    base_task = kaniko_op(
+        build_context=clone_task.outputs['workspace'],
+        context_subdir=build_context_path,
+        dockerfile='components/base/Dockerfile',
+        destination_image=plan_task.outputs['base_image'],
+        build=plan_task.outputs['base_build'],
+        cache_repo=cache_repo,
+        insecure_registry=insecure_registry
+    )
+    kubernetes.use_secret_as_volume(base_task, secret_name=harbor_secret_name, mount_path=DOCKER_CONFIG_MOUNT_PATH)
+
+    # 5. Build all component images in parallel using Kaniko, skipping unchanged ones
     build_tasks = {}
-    for name, context_path in components_to_build.items():
-        image_name = f"{harbor_repo_prefix}/iris-{name}:{git_commit_sha}"
-        
+    for name, dockerfile_path in components_to_build.items():
         build_task = kaniko_op(
             # The build context is a sub-path within the cloned repository
-            build_context=clone_task.outputs['workspace'].join_path(context_path),
-            destination_image=image_name,
-            docker_config_secret_name=harbor_secret_name
-        )
+            build_context=clone_task.outputs['workspace'],
+        context_subdir=build_context_path,
+            dockerfile=dockerfile_path,
+            destination_image=plan_task.outputs[f'{name}_image'],
+            build=plan_task.outputs[f'{name}_build'],
+            base_image=plan_task.outputs['base_image'],
+            cache_repo=cache_repo,
+            insecure_registry=insecure_registry
+        ).after(base_task)
+        kubernetes.use_secret_as_volume(build_task, secret_name=harbor_secret_name, mount_path=DOCKER_CONFIG_MOUNT_PATH)
         build_tasks[name] = build_task
 
-    # 4. After all builds are complete, trigger the main ML pipeline
-    with dsl.Condition(build_tasks['download'].state == 'SUCCEEDED' and 
-                       build_tasks['train'].state == 'SUCCEEDED' and 
-                       build_tasks['predict'].state == 'SUCCEEDED'):
-
-        # We need a component to make the final API call to KFP to run the pipeline.
-        # This is an advanced use case. For now, we will represent this as a final step.
-        # In a real implementation, this would be a component that uses the KFP SDK.
-        
-        # This is a placeholder showing the intent. A real implementation
-        # would require a component with the kfp-server-api or kfp sdk installed.
-        trigger_op = dsl.ContainerSpec(
-            image='python:3.9-slim',
-            command=['sh', '-c'],
-            args=[
-                'pip install kfp-server-api==1.8.5 && ' # Example, match your KFP version
-                'echo "Triggering ML pipeline with the following images:" && '
-                f'echo "Download Image: {build_tasks["download"].outputs["destination_image"]}" && '
-                f'echo "Train Image: {build_tasks["train"].outputs["destination_image"]}" && '
-                f'echo "Predict Image: {build_tasks["predict"].outputs["destination_image"]}"'
-                # The actual trigger command would be here, e.g.:
-                # 'python trigger_script.py --endpoint $KFP_ENDPOINT ...'
-            ]
-        )
+    # 6. After all builds are complete, trigger the main ML pipeline with the
+    # new images and record the per-stage build durations in a report
+    trigger_task = trigger_pipeline_op(
+        workspace=clone_task.outputs['workspace'],
+        plan=plan_task.outputs['plan'],
+        kfp_host=kfp_host,
+        experiment_name=experiment_name,
+        namespace=namespace,
+        pipeline_arguments=pipeline_arguments,
+        base_build_seconds=base_task.outputs['build_seconds'],
+        download_build_seconds=build_tasks['download'].outputs['build_seconds'],
+        train_build_seconds=build_tasks['train'].outputs['build_seconds'],
+        predict_build_seconds=build_tasks['predict'].outputs['build_seconds']
+    )
+    # Selects the access-ml-pipeline PodDefault, which mounts the KFP service
+    # account token the client needs to submit runs in a multi-user install
+    kubernetes.add_pod_label(trigger_task, 'access-ml-pipeline', 'true')
 
 
 if __name__ == '__main__':
@@ -84,4 +132,3 @@ if __name__ == '__main__':
         package_path='../manifests/kubeflow/ci_pipeline_compiled.yaml'
     )
     print("CI Pipeline compiled successfully to ../manifests/kubeflow/ci_pipeline_compiled.yaml")
-
@@ -1,4 +1,8 @@
 from kfp import dsl
+from kfp import kubernetes
+
+# Where the train step mounts the checkpoint volume
+CHECKPOINT_MOUNT_PATH = '/mnt/checkpoints'
 
 @dsl.pipeline(
     name='iris-classification-pipeline',
@@ -10,6 +14,11 @@ def iris_pipeline(
     model_hyperparameters: str = '{"objective":"multi:softprob", "eval_metric":"mlogloss", "random_state":42}',
     prediction_data: str = "5.1,3.5,1.4,0.2;6.7,3.0,5.2,2.3",
 
+    # --- Parameters for Training Runs ---
+    use_checkpoints: bool = False, # Checkpoint xgboost training to a PVC so a preempted run can resume
+    checkpoint_pvc_name: str = 'iris-train-checkpoints', # PVC from manifests/k8s/train-checkpoints-pvc.yaml, only needed with use_checkpoints
+    early_stopping_rounds: int = 0, # 0 disables xgboost early stopping
+
     # --- Parameters for CI/CD: These will be provided by the CI pipeline ---
     # Updated to use Harbor registry images
     download_image: str = '192.168.58.12:30002/kubeflow-iris/iris-download:v1.0',
@@ -28,16 +37,30 @@ def iris_pipeline(
     )
 
     # --- 2. Train Component ---
-    train_task = dsl.ContainerSpec(
-        image=train_image,
-        command=["python", "train.py"],
-        args=[
-            "--data_path", dsl.InputPath('data'),
-            "--model_output_path", dsl.OutputPath('model'),
-            "--model-name", model_name,
-            "--model-hyperparameters", model_hyperparameters
-        ]
-    )(data=download_task.outputs['data'])
+    def train_spec(checkpoint_dir):
+        return dsl.ContainerSpec(
+            image=train_image,
+            command=["python", "train.py"],
+            args=[
+                "--data_path", dsl.InputPath('data'),
+                "--model_output_path", dsl.OutputPath('model'),
+                "--schema_output_path", dsl.OutputPath('feature_schema'),
+                "--profile_output_path", dsl.OutputPath('reference_profile'),
+                "--model-name", model_name,
+                "--model-hyperparameters", model_hyperparameters,
+                "--checkpoint_dir", checkpoint_dir,
+                "--early_stopping_rounds", early_stopping_rounds
+            ]
+        )
+
+    # The checkpoint volume is only mounted when checkpointing is enabled, so
+    # runs without it do not need the PVC. Checkpoints always go to the mount;
+    # each training configuration gets its own fingerprinted subdirectory.
+    with dsl.If(use_checkpoints == False):
+        train_task = train_spec('')(data=download_task.outputs['data'])
+    with dsl.Else():
+        checkpointed_train_task = train_spec(CHECKPOINT_MOUNT_PATH)(data=download_task.outputs['data'])
+        kubernetes.mount_pvc(checkpointed_train_task, pvc_name=checkpoint_pvc_name, mount_path=CHECKPOINT_MOUNT_PATH)
 
     # --- 3. Predict Component ---
     predict_task = dsl.ContainerSpec(
@@ -45,9 +68,10 @@ def iris_pipeline(
         command=["python", "predict.py"],
         args=[
             "--model_path", dsl.InputPath('model'),
-            "--input_data", prediction_data
+            "--input_data", prediction_data,
+            "--predictions_output_path", dsl.OutputPath('predictions')
         ]
-    )(model=train_task.outputs['model'])
+    )(model=dsl.OneOf(train_task.outputs['model'], checkpointed_train_task.outputs['model']))
 
 if __name__ == '__main__':
     from kfp import compiler
@@ -1,5 +1,6 @@
 from kfp import dsl
 from kfp import components
+from kfp import kubernetes
 
 # Load components from YAML files
 # These YAMLs now contain Harbor registry images
@@ -7,6 +8,9 @@ download_op = components.load_component_from_file('../components/download/compon
 train_op = components.load_component_from_file('../components/train/component.yaml')
 predict_op = components.load_component_from_file('../components/predict/component.yaml')
 
+# Where the train step mounts the checkpoint volume
+CHECKPOINT_MOUNT_PATH = '/mnt/checkpoints'
+
 @dsl.pipeline(
     name='iris-classification-pipeline',
     description='A pipeline that trains and predicts on the Iris dataset using Harbor registry images.'
@@ -15,7 +19,12 @@ def iris_pipeline(
     # --- Parameters for ML Logic ---
     model_name: str = 'xgboost',
     model_hyperparameters: str = '{"objective":"multi:softprob", "eval_metric":"mlogloss", "random_state":42}',
-    prediction_data: str = "5.1,3.5,1.4,0.2;6.7,3.0,5.2,2.3"
+    prediction_data: str = "5.1,3.5,1.4,0.2;6.7,3.0,5.2,2.3",
+
+    # --- Parameters for Training Runs ---
+    use_checkpoints: bool = False, # Checkpoint xgboost training to a PVC so a preempted run can resume
+    checkpoint_pvc_name: str = 'iris-train-checkpoints', # PVC from manifests/k8s/train-checkpoints-pvc.yaml, only needed with use_checkpoints
+    early_stopping_rounds: int = 0 # 0 disables xgboost early stopping
 ):
     """
     Defines the Iris classification pipeline using component-based approach.
@@ -31,15 +40,29 @@ def iris_pipeline(
     download_task = download_op()
 
     # --- 2. Train Component ---
-    train_task = train_op(
-        data=download_task.outputs['data'],
-        model_name=model_name,
-        model_hyperparameters=model_hyperparameters
-    )
+    # The checkpoint volume is only mounted when checkpointing is enabled, so
+    # runs without it do not need the PVC. Checkpoints always go to the mount;
+    # each training configuration gets its own fingerprinted subdirectory.
+    with dsl.If(use_checkpoints == False):
+        train_task = train_op(
+            data=download_task.outputs['data'],
+            model_name=model_name,
+            model_hyperparameters=model_hyperparameters,
+            early_stopping_rounds=early_stopping_rounds
+        )
+    with dsl.Else():
+        checkpointed_train_task = train_op(
+            data=download_task.outputs['data'],
+            model_name=model_name,
+            model_hyperparameters=model_hyperparameters,
+            checkpoint_dir=CHECKPOINT_MOUNT_PATH,
+            early_stopping_rounds=early_stopping_rounds
+        )
+        kubernetes.mount_pvc(checkpointed_train_task, pvc_name=checkpoint_pvc_name, mount_path=CHECKPOINT_MOUNT_PATH)
 
     # --- 3. Predict Component ---
     predict_task = predict_op(
-        model=train_task.outputs['model'],
+        model=dsl.OneOf(train_task.outputs['model'], checkpointed_train_task.outputs['model']),
         input_data=prediction_data
     )
 
@@ -0,0 +1,158 @@
+"""
+Micro-benchmark for the serving hot path
+
+Measures request validation against the feature schema and drift statistics
+updates relative to model inference, so the overhead of both stays a small
+fraction of predict time. Also reports prediction parity and throughput of
+the float32 and quantized inference modes against float64.
+
+Usage:
+    python benchmark.py --batch-sizes 1,32,1024,16384 --repeats 50
+"""
+import argparse
+import time
+
+import numpy as np
+import xgboost as xgb
+from sklearn.datasets import load_iris
+
+from drift import DriftMonitor, DriftStatistics, ReferenceProfile
+from precision import QuantizedPredictor
+from schema import FeatureSchema
+
+
+def time_ms(fn, repeats):
+    """Median wall time of fn() in milliseconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def build_fixture():
+    """Train a small XGBoost model and a schema from the Iris data"""
+    iris = load_iris()
+    model = xgb.XGBClassifier(objective='multi:softprob', eval_metric='mlogloss', random_state=42)
+    model.fit(iris.data, iris.target)
+
+    schema = FeatureSchema(
+        feature_names=iris.feature_names,
+        min_values=iris.data.min(axis=0),
+        max_values=iris.data.max(axis=0),
+    )
+    return iris, model, schema
+
+
+def build_reference(data, n_bins=10):
+    """Reference profile in the same layout train.py writes"""
+    bin_edges = np.linspace(data.min(axis=0), data.max(axis=0), n_bins + 1, axis=1)
+    bin_counts = [
+        [0] + np.histogram(data[:, i], bins=bin_edges[i])[0].tolist() + [0]
+        for i in range(data.shape[1])
+    ]
+    return ReferenceProfile(
+        feature_names=[f"feature_{i}" for i in range(data.shape[1])],
+        count=data.shape[0],
+        mean=data.mean(axis=0),
+        var=data.var(axis=0, ddof=1),
+        bin_edges=bin_edges,
+        bin_counts=bin_counts,
+    )
+
+
+def make_batch(data, batch_size, rng):
+    """Sample a request batch as the list-of-lists FastAPI hands to the server"""
+    rows = rng.integers(0, len(data), size=batch_size)
+    return data[rows].tolist()
+
+
+def benchmark_validation(iris, model, schema, batch_sizes, repeats, rng):
+    print("Validation vs inference")
+    print(f"{'batch':>8} {'validate_ms':>12} {'predict_ms':>12} {'overhead':>9}")
+    for batch_size in batch_sizes:
+        instances = make_batch(iris.data, batch_size, rng)
+        X, _ = schema.validate(instances)
+
+        validate_ms = time_ms(lambda: schema.validate(instances, 'clip'), repeats)
+        predict_ms = time_ms(lambda: model.predict(X), repeats)
+        print(f"{batch_size:>8} {validate_ms:>12.3f} {predict_ms:>12.3f} {validate_ms / predict_ms:>8.1%}")
+
+
+def benchmark_drift(iris, model, schema, batch_sizes, repeats, rng):
+    """
+    Time the background statistics update and the enqueue on the request path
+
+    Only observe() runs inside the request; update() runs on the drift
+    monitor thread but still competes for CPU, so both are reported.
+    """
+    reference = build_reference(iris.data)
+
+    print("Drift statistics vs inference")
+    print(f"{'batch':>8} {'observe_ms':>12} {'update_ms':>12} {'predict_ms':>12} {'overhead':>9}")
+    for batch_size in batch_sizes:
+        X, _ = schema.validate(make_batch(iris.data, batch_size, rng))
+        stats = DriftStatistics(reference)
+        monitor = DriftMonitor(reference, max_queue_size=repeats)
+
+        observe_ms = time_ms(lambda: monitor.observe(X), repeats)
+        update_ms = time_ms(lambda: stats.update(X), repeats)
+        predict_ms = time_ms(lambda: model.predict(X), repeats)
+        print(f"{batch_size:>8} {observe_ms:>12.4f} {update_ms:>12.3f} {predict_ms:>12.3f} "
+              f"{(observe_ms + update_ms) / predict_ms:>8.1%}")
+
+
+def benchmark_precision(iris, model, schema, n_samples, repeats, rng):
+    """
+    Accuracy parity and throughput of reduced-precision modes against float64
+
+    Parity is measured on the Iris data plus uniform samples across the
+    training range, which exercises many more split boundaries than Iris alone.
+    """
+    lo, hi = schema.min_values, schema.max_values
+    X64 = np.vstack([iris.data, rng.uniform(lo, hi, size=(n_samples, len(lo)))])
+    X32 = X64.astype(np.float32)
+    n_iris = len(iris.data)
+
+    quantized = QuantizedPredictor.from_model(model, X32.shape[1], max_table_size=0)
+    lookup_table = QuantizedPredictor.from_model(model, X32.shape[1])
+    modes = {
+        'float64': lambda: model.predict(X64),
+        'float32': lambda: model.predict(X32),
+        'quantized': lambda: quantized.predict(X32),
+        'lookup_table': lambda: lookup_table.predict(X32),
+    }
+
+    baseline = model.predict(X64)
+
+    print(f"Precision parity and throughput ({len(X64)} rows)")
+    print(f"{'mode':>13} {'agreement':>10} {'accuracy':>9} {'predict_ms':>11} {'rows/s':>12}")
+    for mode, predict in modes.items():
+        predictions = predict()
+        agreement = np.mean(predictions == baseline)
+        accuracy = np.mean(predictions[:n_iris] == iris.target)
+        predict_ms = time_ms(predict, repeats)
+        print(f"{mode:>13} {agreement:>10.4%} {accuracy:>9.4f} {predict_ms:>11.3f} {len(X64) / predict_ms * 1000:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the serving hot path.')
+    parser.add_argument('--batch-sizes', type=str, default='1,32,1024,16384', help='Comma-separated request batch sizes.')
+    parser.add_argument('--repeats', type=int, default=50, help='Timed repetitions per measurement.')
+    parser.add_argument('--parity-samples', type=int, default=100000, help='Random samples added to Iris for the precision parity report.')
+    args = parser.parse_args()
+
+    batch_sizes = [int(b) for b in args.batch_sizes.split(',') if b]
+    rng = np.random.default_rng(42)
+    iris, model, schema = build_fixture()
+
+    benchmark_validation(iris, model, schema, batch_sizes, args.repeats, rng)
+    print()
+    benchmark_drift(iris, model, schema, batch_sizes, args.repeats, rng)
+    print()
+    benchmark_precision(iris, model, schema, args.parity_samples, args.repeats, rng)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""
+Online drift statistics for live prediction traffic
+"""
+import json
+import logging
+import queue
+import threading
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Floor applied to bin proportions so empty bins do not blow up the PSI
+PSI_EPSILON = 1e-4
+
+
+class ReferenceProfile:
+    """
+    Per-feature training statistics written by train.py
+
+    Histogram edges are uniform between the training min and max; the
+    counts include an underflow and an overflow bin on either side.
+    """
+
+    def __init__(self, feature_names, count, mean, var, bin_edges, bin_counts):
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        self.count = int(count)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.var = np.asarray(var, dtype=np.float64)
+        self.bin_edges = np.asarray(bin_edges, dtype=np.float64)
+        self.bin_counts = np.asarray(bin_counts, dtype=np.float64)
+        self.n_bins = self.bin_edges.shape[1] - 1
+
+        if self.bin_counts.shape != (self.n_features, self.n_bins + 2):
+            raise ValueError(
+                f"Reference histogram must have shape {(self.n_features, self.n_bins + 2)}, "
+                f"got {self.bin_counts.shape}"
+            )
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            feature_names=data['feature_names'],
+            count=data['count'],
+            mean=data['mean'],
+            var=data['var'],
+            bin_edges=data['bin_edges'],
+            bin_counts=data['bin_counts'],
+        )
+
+    @classmethod
+    def load(cls, path):
+        with open(Path(path), 'r') as f:
+            return cls.from_dict(json.load(f))
+
+
+class DriftStatistics:
+    """
+    Streaming per-feature mean/variance and fixed-bin histograms
+
+    Each batch is reduced with NumPy and merged into the running totals
+    using the parallel form of Welford's algorithm, so the cost per batch is
+    a few array operations regardless of batch size.
+    """
+
+    def __init__(self, reference):
+        self.reference = reference
+        n_features = reference.n_features
+
+        self.count = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.bin_counts = np.zeros((n_features, reference.n_bins + 2), dtype=np.int64)
+
+        # Precomputed for vectorized binning with uniform edges
+        self._lo = reference.bin_edges[:, 0]
+        self._hi = reference.bin_edges[:, -1]
+        width = self._hi - self._lo
+        self._inv_width = np.divide(
+            reference.n_bins, width, out=np.zeros_like(width), where=width > 0
+        )
+        self._offsets = np.arange(n_features) * (reference.n_bins + 2)
+        self._edges = reference.bin_edges.ravel()
+        self._edge_offsets = np.arange(n_features) * (reference.n_bins + 1)
+
+    def update(self, X):
+        """Merge a 2-D batch into the running statistics"""
+        n_b = X.shape[0]
+        if n_b == 0:
+            return
+
+        # Accumulate in float64 even when serving decodes to float32
+        mean_b = X.mean(axis=0, dtype=np.float64)
+        m2_b = ((X - mean_b) ** 2).sum(axis=0)
+
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * (n_b / n)
+        self.m2 = self.m2 + m2_b + delta ** 2 * (self.count * n_b / n)
+        self.count = n
+
+        # Bin 0 is underflow, bin n_bins + 1 is overflow; like np.histogram,
+        # the last regular bin includes the upper edge
+        n_bins = self.reference.n_bins
+        bins = np.floor((X - self._lo) * self._inv_width).astype(np.int64) + 1
+        np.clip(bins, 1, n_bins, out=bins)
+        # Rounding in the multiply can put a value next to an edge one bin off;
+        # compare against the actual edges so the counts match np.histogram
+        edge_index = bins - 1 + self._edge_offsets
+        bins -= X < self._edges[edge_index]
+        bins += (X >= self._edges[edge_index + 1]) & (bins < n_bins)
+        np.clip(bins, 1, n_bins, out=bins)
+        bins[X < self._lo] = 0
+        bins[X > self._hi] = n_bins + 1
+        flat = (bins + self._offsets).ravel()
+        self.bin_counts += np.bincount(flat, minlength=self.bin_counts.size).reshape(self.bin_counts.shape)
+
+    @property
+    def var(self):
+        if self.count < 2:
+            return np.zeros_like(self.m2)
+        return self.m2 / (self.count - 1)
+
+    def scores(self):
+        """
+        Per-feature drift scores against the reference profile
+
+        The live statistics are None until a batch has been observed, since an
+        empty histogram would otherwise score as maximal drift.
+        """
+        ref = self.reference
+        ref_std = np.sqrt(ref.var)
+
+        if self.count == 0:
+            return {
+                name: {
+                    'psi': None,
+                    'mean_shift': None,
+                    'live_mean': None,
+                    'live_std': None,
+                    'reference_mean': float(ref.mean[i]),
+                    'reference_std': float(ref_std[i]),
+                }
+                for i, name in enumerate(ref.feature_names)
+            }
+
+        live_p = np.maximum(self.bin_counts / self.count, PSI_EPSILON)
+        ref_p = np.maximum(ref.bin_counts / max(ref.count, 1), PSI_EPSILON)
+        psi = ((live_p - ref_p) * np.log(live_p / ref_p)).sum(axis=1)
+
+        mean_shift = np.divide(
+            np.abs(self.mean - ref.mean), ref_std, out=np.zeros_like(ref_std), where=ref_std > 0
+        )
+
+        return {
+            name: {
+                'psi': float(psi[i]),
+                'mean_shift': float(mean_shift[i]),
+                'live_mean': float(self.mean[i]),
+                'live_std': float(np.sqrt(self.var[i])),
+                'reference_mean': float(ref.mean[i]),
+                'reference_std': float(ref_std[i]),
+            }
+            for i, name in enumerate(ref.feature_names)
+        }
+
+
+class DriftMonitor:
+    """
+    Updates drift statistics on a background thread
+
+    The request path only enqueues the validated batch. When the queue is
+    full the batch is dropped and counted rather than blocking the request,
+    which bounds the overhead at any QPS.
+    """
+
+    def __init__(self, reference, max_queue_size=1024):
+        self.stats = DriftStatistics(reference)
+        self.dropped_batches = 0
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='drift-monitor', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def observe(self, X):
+        """Queue a batch for the background thread without blocking"""
+        try:
+            self._queue.put_nowait(X)
+        except queue.Full:
+            self.dropped_batches += 1
+
+    def _run(self):
+        while True:
+            X = self._queue.get()
+            if X is None:
+                break
+            try:
+                with self._lock:
+                    self.stats.update(X)
+            except Exception as e:
+                logger.error(f"Drift statistics update failed: {e}")
+
+    def report(self):
+        with self._lock:
+            return {
+                'observed_instances': self.stats.count,
+                'reference_instances': self.stats.reference.count,
+                'dropped_batches': self.dropped_batches,
+                'pending_batches': self._queue.qsize(),
+                'features': self.stats.scores(),
+            }
@@ -0,0 +1,136 @@
+"""
+Reduced-precision and quantized inference for tree ensembles
+"""
+import json
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_PRECISIONS = ('float64', 'float32')
+
+# Rows per model.predict call when filling the lookup table
+TABLE_BUILD_CHUNK = 65536
+
+
+def _xgboost_thresholds(booster, n_features):
+    """Split thresholds per feature from the raw XGBoost model JSON (exact float32 values)"""
+    thresholds = [[] for _ in range(n_features)]
+    trees = json.loads(booster.save_raw(raw_format='json'))['learner']['gradient_booster']['model']['trees']
+    for tree in trees:
+        left = np.asarray(tree['left_children'])
+        features = np.asarray(tree['split_indices'])[left != -1]
+        conditions = np.asarray(tree['split_conditions'], dtype=np.float32)[left != -1]
+        for f in range(n_features):
+            thresholds[f].append(conditions[features == f])
+
+    # XGBoost goes left when x < threshold, compared in float32
+    return [np.unique(np.concatenate(t)) if t else np.empty(0, dtype=np.float32) for t in thresholds]
+
+
+def _sklearn_thresholds(estimators, n_features):
+    """Split thresholds per feature from fitted sklearn decision trees"""
+    thresholds = [[] for _ in range(n_features)]
+    for estimator in estimators:
+        tree = estimator.tree_
+        for f in range(n_features):
+            thresholds[f].append(tree.threshold[tree.feature == f])
+
+    strict = []
+    for t in thresholds:
+        t = np.unique(np.concatenate(t)) if t else np.empty(0)
+        # sklearn goes left when float32(x) <= threshold (float64). Round each
+        # threshold down to float32 and step up one ulp to get the equivalent
+        # strict x < threshold split in float32.
+        floor32 = t.astype(np.float32)
+        floor32 = np.where(floor32.astype(np.float64) > t, np.nextafter(floor32, np.float32(-np.inf)), floor32)
+        strict.append(np.unique(np.nextafter(floor32, np.float32(np.inf))))
+    return strict
+
+
+def split_thresholds(model, n_features):
+    """
+    Per-feature split thresholds of a tree ensemble, as sorted float32 arrays
+    with "go left when x < threshold" semantics
+
+    Returns None for models that are not tree ensembles.
+    """
+    if hasattr(model, 'get_booster'):
+        return _xgboost_thresholds(model.get_booster(), n_features)
+    if hasattr(model, 'estimators_') and all(hasattr(e, 'tree_') for e in model.estimators_):
+        return _sklearn_thresholds(model.estimators_, n_features)
+    if hasattr(model, 'tree_'):
+        return _sklearn_thresholds([model], n_features)
+    return None
+
+
+class QuantizedPredictor:
+    """
+    Predicts on features quantized to the model's split thresholds
+
+    Every value between two consecutive thresholds takes the same path through
+    every tree, so replacing it with a representative of its bin gives exactly
+    the same prediction. When the product of per-feature bin counts is small
+    enough, all predictions are precomputed into a lookup table indexed by the
+    bin tuple and inference becomes a single gather.
+    """
+
+    def __init__(self, model, thresholds, max_table_size=1_000_000):
+        self.model = model
+        self.thresholds = thresholds
+        self.n_bins = np.array([t.size + 1 for t in thresholds], dtype=np.int64)
+
+        # Bin 0 is below the first threshold, bin k lies in [t[k-1], t[k])
+        self.representatives = [
+            np.concatenate([np.nextafter(t[:1], np.float32(-np.inf)), t]) if t.size else np.zeros(1, dtype=np.float32)
+            for t in thresholds
+        ]
+
+        # Row-major strides to flatten a bin tuple into a table index
+        self.strides = np.cumprod(np.concatenate([self.n_bins[1:], [1]])[::-1])[::-1].astype(np.int64)
+
+        self.table = None
+        table_size = int(np.prod(self.n_bins.astype(np.float64)))
+        if table_size <= max_table_size:
+            self.table = self._build_table(table_size)
+            logger.info(f"Built prediction lookup table with {table_size} entries (bins per feature: {self.n_bins.tolist()})")
+        else:
+            logger.info(f"Lookup table would need {table_size} entries (limit {max_table_size}), predicting on quantized features")
+
+    @classmethod
+    def from_model(cls, model, n_features, max_table_size=1_000_000):
+        """Build a quantized predictor, or return None if the model is not a tree ensemble"""
+        thresholds = split_thresholds(model, n_features)
+        if thresholds is None:
+            return None
+        return cls(model, thresholds, max_table_size)
+
+    def quantize(self, X):
+        """Map each feature value to its bin index"""
+        bins = np.empty(X.shape, dtype=np.int64)
+        X = X.astype(np.float32, copy=False)
+        for f, t in enumerate(self.thresholds):
+            bins[:, f] = np.searchsorted(t, X[:, f], side='right')
+        return bins
+
+    def dequantize(self, bins):
+        """Representative float32 feature values for a batch of bin indices"""
+        X = np.empty(bins.shape, dtype=np.float32)
+        for f, reps in enumerate(self.representatives):
+            X[:, f] = reps[bins[:, f]]
+        return X
+
+    def _build_table(self, table_size):
+        chunks = []
+        for start in range(0, table_size, TABLE_BUILD_CHUNK):
+            index = np.arange(start, min(start + TABLE_BUILD_CHUNK, table_size), dtype=np.int64)
+            bins = (index[:, None] // self.strides) % self.n_bins
+            chunks.append(self.model.predict(self.dequantize(bins)))
+        return np.concatenate(chunks)
+
+    def predict(self, X):
+        bins = self.quantize(X)
+        if self.table is not None:
+            return self.table[bins @ self.strides]
+        return self.model.predict(self.dequantize(bins))
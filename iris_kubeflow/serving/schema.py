@@ -0,0 +1,162 @@
+"""
+Feature schema used to validate prediction requests against the training data
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+
+# How to treat rows whose features fall outside the training min/max
+OUT_OF_RANGE_POLICIES = ('allow', 'reject', 'clip')
+
+# Maximum number of offending row indices quoted in an error message
+MAX_REPORTED_ROWS = 10
+
+
+class FeatureSchema:
+    """
+    Compiled feature schema written by train.py
+
+    The bounds are kept as NumPy arrays so a whole batch is validated with a
+    handful of vectorized comparisons instead of a Python loop per row.
+    """
+
+    def __init__(self, feature_names, dtype='float64', min_values=None, max_values=None):
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        self.dtype = np.dtype(dtype)
+
+        if min_values is None:
+            min_values = [-np.inf] * self.n_features
+        if max_values is None:
+            max_values = [np.inf] * self.n_features
+
+        self.min_values = np.asarray(min_values, dtype=self.dtype)
+        self.max_values = np.asarray(max_values, dtype=self.dtype)
+
+        if self.min_values.shape != (self.n_features,) or self.max_values.shape != (self.n_features,):
+            raise ValueError(
+                f"Schema bounds must have {self.n_features} values, "
+                f"got min={self.min_values.shape} max={self.max_values.shape}"
+            )
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a schema from the JSON document produced by train.py"""
+        return cls(
+            feature_names=data['feature_names'],
+            dtype=data.get('dtype', 'float64'),
+            min_values=data.get('min'),
+            max_values=data.get('max'),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Load a schema from a JSON file"""
+        with open(Path(path), 'r') as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def unbounded(cls, n_features):
+        """Schema that only enforces the feature count, used when no schema file is available"""
+        return cls([f"feature_{i}" for i in range(n_features)])
+
+    def with_dtype(self, dtype):
+        """Copy of the schema that decodes requests into a different dtype"""
+        return FeatureSchema(self.feature_names, dtype, self.min_values, self.max_values)
+
+    def to_dict(self):
+        return {
+            'feature_names': self.feature_names,
+            'dtype': self.dtype.name,
+            'min': self.min_values.tolist(),
+            'max': self.max_values.tolist(),
+        }
+
+    def to_array(self, instances):
+        """
+        Convert request instances into a 2-D array of the schema dtype
+
+        Passing the dtype up front makes NumPy reject ragged rows instead of
+        silently building an object array.
+        """
+        try:
+            with np.errstate(over='ignore'):
+                X = np.asarray(instances, dtype=self.dtype)
+        except (ValueError, TypeError):
+            raise ValueError(
+                f"Instances must be a rectangular list of rows with {self.n_features} numeric features each"
+            )
+
+        if X.ndim != 2 or X.shape[0] == 0:
+            raise ValueError(f"Expected a non-empty 2-D batch of instances, got shape {X.shape}")
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+
+        # Finite values beyond the range of a reduced-precision dtype overflow to
+        # inf. Saturate them at the dtype's largest value instead, so they are
+        # reported as out of range rather than as non-finite input
+        if self.dtype != np.float64 and not np.isfinite(X).all():
+            X64 = np.asarray(instances, dtype=np.float64)
+            overflow = np.isinf(X) & np.isfinite(X64)
+            X[overflow] = np.copysign(np.finfo(self.dtype).max, X64[overflow])
+
+        return X
+
+    def validate(self, instances, out_of_range='allow'):
+        """
+        Validate a batch of instances
+
+        Returns the validated array and the number of rows that fell outside
+        the training range. See ``check`` for how those rows are handled.
+        """
+        return self.check(self.to_array(instances), out_of_range)
+
+    def check(self, X, out_of_range='allow'):
+        """
+        Validate an array produced by ``to_array``
+
+        Non-finite values are always rejected; out-of-range rows are handled
+        by ``apply_range_policy``.
+        """
+        self.check_finite(X)
+        return self.apply_range_policy(X, out_of_range)
+
+    def check_finite(self, X):
+        """Reject rows containing NaN or infinite values"""
+        finite_rows = np.isfinite(X).all(axis=1)
+        if not finite_rows.all():
+            bad_rows = np.flatnonzero(~finite_rows)
+            raise ValueError(
+                f"{bad_rows.size} instance(s) contain NaN or infinite values, "
+                f"rows: {bad_rows[:MAX_REPORTED_ROWS].tolist()}"
+            )
+
+    def apply_range_policy(self, X, out_of_range='allow'):
+        """
+        Allow, reject or clip rows outside the training range
+
+        Returns the array to predict on and the number of out-of-range rows.
+        Clipping writes to a copy, so ``X`` keeps the values that were actually
+        requested.
+        """
+        if out_of_range not in OUT_OF_RANGE_POLICIES:
+            raise ValueError(
+                f"Unsupported out_of_range policy: {out_of_range}. "
+                f"Supported options are {', '.join(OUT_OF_RANGE_POLICIES)}."
+            )
+
+        outside = ((X < self.min_values) | (X > self.max_values)).any(axis=1)
+        n_outside = int(np.count_nonzero(outside))
+
+        if n_outside:
+            if out_of_range == 'reject':
+                bad_rows = np.flatnonzero(outside)
+                raise ValueError(
+                    f"{n_outside} instance(s) outside the training feature range, "
+                    f"rows: {bad_rows[:MAX_REPORTED_ROWS].tolist()}"
+                )
+            if out_of_range == 'clip':
+                X = np.clip(X, self.min_values, self.max_values)
+
+        return X, n_outside
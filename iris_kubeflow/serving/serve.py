@@ -4,28 +4,49 @@ KServe-compatible FastAPI server for Iris XGBoost model
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import pickle
-import numpy as np
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Literal, Optional
 import logging
+import os
+
+from drift import DriftMonitor, ReferenceProfile
+from precision import SUPPORTED_PRECISIONS, QuantizedPredictor
+from schema import FeatureSchema
+from structured_logging import get_sampled_logger, setup_logging, timer
 
 # Setup logging
-logging.basicConfig(level=logging.INFO)
+setup_logging()
 logger = logging.getLogger(__name__)
+request_logger = get_sampled_logger(f"{__name__}.requests")
 
 app = FastAPI(title="Iris Model Server", version="1.0")
 
 # Model configuration
 MODEL_PATH = Path("/mnt/models/model")  # KServe downloads without extension
+SCHEMA_PATH = Path(os.environ.get("FEATURE_SCHEMA_PATH", "/mnt/models/feature_schema"))
+REQUIRE_FEATURE_SCHEMA = os.environ.get("REQUIRE_FEATURE_SCHEMA", "true").lower() == "true"
+PROFILE_PATH = Path(os.environ.get("REFERENCE_PROFILE_PATH", "/mnt/models/reference_profile"))
+REQUIRE_REFERENCE_PROFILE = os.environ.get("REQUIRE_REFERENCE_PROFILE", "true").lower() == "true"
+DRIFT_MONITORING = os.environ.get("DRIFT_MONITORING", "true").lower() == "true"
+DRIFT_QUEUE_SIZE = int(os.environ.get("DRIFT_QUEUE_SIZE", "1024"))
+INFERENCE_PRECISION = os.environ.get("INFERENCE_PRECISION", "float64")
+QUANTIZE_FEATURES = os.environ.get("QUANTIZE_FEATURES", "false").lower() == "true"
+LOOKUP_TABLE_MAX_SIZE = int(os.environ.get("LOOKUP_TABLE_MAX_SIZE", "1000000"))
 CLASS_NAMES = ['setosa', 'versicolor', 'virginica']
+N_FEATURES = 4
 
-# Global model variable
+# Global model, feature schema, drift monitor and optional quantized predictor
 model = None
+feature_schema = None
+drift_monitor = None
+quantized_predictor = None
 
 
 class PredictionRequest(BaseModel):
     """Request format for predictions"""
     instances: List[List[float]]
+    # What to do with rows outside the training feature range
+    out_of_range: Literal['allow', 'reject', 'clip'] = 'allow'
 
     class Config:
         schema_extra = {
@@ -33,7 +54,8 @@ class PredictionRequest(BaseModel):
                 "instances": [
                     [5.1, 3.5, 1.4, 0.2],
                     [6.7, 3.0, 5.2, 2.3]
-                ]
+                ],
+                "out_of_range": "reject"
             }
         }
 
@@ -46,12 +68,13 @@ class PredictionResponse(BaseModel):
 
 @app.on_event("startup")
 async def load_model():
-    """Load model at server startup"""
-    global model
+    """Load model, feature schema and drift reference profile at server startup"""
+    global model, feature_schema, drift_monitor, quantized_predictor
     try:
         logger.info(f"Loading model from {MODEL_PATH}")
 
-        if not MODEL_PATH.exists():
+        dummy_model = not MODEL_PATH.exists()
+        if dummy_model:
             logger.warning(f"Model file not found at {MODEL_PATH}, using dummy model")
             # Create a dummy model for testing
             from sklearn.ensemble import RandomForestClassifier
@@ -60,14 +83,63 @@ async def load_model():
             iris = load_iris()
             model = RandomForestClassifier(random_state=42)
             model.fit(iris.data, iris.target)
-            logger.info("Dummy model created and trained")
+            feature_schema = FeatureSchema(iris.feature_names, min_values=iris.data.min(axis=0), max_values=iris.data.max(axis=0))
+            logger.info("Dummy model and feature schema created from the Iris dataset")
         else:
             with open(MODEL_PATH, 'rb') as f:
                 model = pickle.load(f)
             logger.info(f"Model loaded successfully from {MODEL_PATH}")
 
+            if SCHEMA_PATH.exists():
+                feature_schema = FeatureSchema.load(SCHEMA_PATH)
+                logger.info(f"Feature schema loaded from {SCHEMA_PATH}: {feature_schema.feature_names}")
+            elif REQUIRE_FEATURE_SCHEMA:
+                raise FileNotFoundError(
+                    f"Feature schema not found at {SCHEMA_PATH}. "
+                    f"Set REQUIRE_FEATURE_SCHEMA=false to serve with only the feature count checked."
+                )
+            else:
+                logger.warning(f"Feature schema not found at {SCHEMA_PATH}, only the feature count will be checked")
+                feature_schema = FeatureSchema.unbounded(N_FEATURES)
+
+        # Decode requests straight into the inference precision
+        if INFERENCE_PRECISION not in SUPPORTED_PRECISIONS:
+            raise ValueError(
+                f"Unsupported INFERENCE_PRECISION: {INFERENCE_PRECISION}. "
+                f"Supported options are {', '.join(SUPPORTED_PRECISIONS)}."
+            )
+
+        if QUANTIZE_FEATURES:
+            quantized_predictor = QuantizedPredictor.from_model(model, feature_schema.n_features, LOOKUP_TABLE_MAX_SIZE)
+            if quantized_predictor is None:
+                logger.warning("QUANTIZE_FEATURES is only supported for tree ensembles, using the model directly")
+            else:
+                logger.info(f"Feature quantization enabled (bins per feature: {quantized_predictor.n_bins.tolist()})")
+
+        # The quantized predictor compares features in float32, like the trees it replaces
+        precision = INFERENCE_PRECISION
+        if quantized_predictor is not None and precision != 'float32':
+            logger.warning(f"QUANTIZE_FEATURES requires float32, overriding INFERENCE_PRECISION={precision}")
+            precision = 'float32'
+        feature_schema = feature_schema.with_dtype(precision)
+        logger.info(f"Inference precision: {precision}")
+
+        if not DRIFT_MONITORING:
+            logger.info("Drift monitoring disabled")
+        elif PROFILE_PATH.exists():
+            drift_monitor = DriftMonitor(ReferenceProfile.load(PROFILE_PATH), max_queue_size=DRIFT_QUEUE_SIZE)
+            drift_monitor.start()
+            logger.info(f"Drift monitoring enabled with reference profile from {PROFILE_PATH}")
+        elif REQUIRE_REFERENCE_PROFILE and not dummy_model:
+            raise FileNotFoundError(
+                f"Reference profile not found at {PROFILE_PATH}. "
+                f"Set REQUIRE_REFERENCE_PROFILE=false or DRIFT_MONITORING=false to serve without drift monitoring."
+            )
+        else:
+            logger.warning(f"Reference profile not found at {PROFILE_PATH}, drift monitoring disabled")
+
         # Test prediction
-        test_input = np.array([[5.1, 3.5, 1.4, 0.2]])
+        test_input, _ = feature_schema.validate([[5.1, 3.5, 1.4, 0.2]])
         test_pred = model.predict(test_input)
         logger.info(f"Model test prediction: {test_pred[0]} (class: {CLASS_NAMES[test_pred[0]]})")
 
@@ -76,6 +148,13 @@ async def load_model():
         raise RuntimeError(f"Failed to load model: {e}")
 
 
+@app.on_event("shutdown")
+async def stop_drift_monitor():
+    """Stop the drift monitor background thread"""
+    if drift_monitor is not None:
+        drift_monitor.stop()
+
+
 @app.get("/")
 async def root():
     """Root endpoint with service info"""
@@ -87,7 +166,8 @@ async def root():
         "endpoints": {
             "health": "/health",
             "predict_v1": "/v1/models/iris-model:predict",
-            "predict": "/predict"
+            "predict": "/predict",
+            "drift": "/v1/models/iris-model/drift"
         }
     }
 
@@ -109,6 +189,21 @@ async def health():
     }
 
 
+@app.get("/drift")
+@app.get("/v1/models/iris-model/drift")
+async def drift():
+    """
+    Drift scores of live traffic against the training reference profile
+
+    Per feature: population stability index (psi) over the reference
+    histogram bins and the live mean shift in reference standard deviations.
+    """
+    if drift_monitor is None:
+        raise HTTPException(status_code=404, detail="Drift monitoring is not enabled")
+
+    return drift_monitor.report()
+
+
 @app.post("/v1/models/iris-model:predict", response_model=PredictionResponse)
 async def predict_v1(request: PredictionRequest):
     """
@@ -122,9 +217,14 @@ async def predict_v1(request: PredictionRequest):
         "instances": [
             [5.1, 3.5, 1.4, 0.2],
             [6.7, 3.0, 5.2, 2.3]
-        ]
+        ],
+        "out_of_range": "reject"
     }
 
+    Instances are validated against the feature schema saved by train.py.
+    Rows with NaN/inf values are always rejected; rows outside the training
+    range are allowed (default), rejected or clipped per request.
+
     Example response:
     {
         "predictions": [0, 2],
@@ -135,17 +235,28 @@ async def predict_v1(request: PredictionRequest):
         raise HTTPException(status_code=503, detail="Model not loaded")
 
     try:
-        logger.info(f"Received prediction request with {len(request.instances)} instances")
+        timings = {}
+
+        # Convert to numpy array and validate against the feature schema. X keeps
+        # the requested values; X_model is clipped when out_of_range is 'clip'
+        with timer(timings, 'validate_ms'):
+            X = feature_schema.to_array(request.instances)
+            feature_schema.check_finite(X)
 
-        # Convert to numpy array
-        X = np.array(request.instances)
+            # Drift statistics are updated off the request path. The batch is queued
+            # before the range policy, so neither clipping nor rejecting hides
+            # out-of-range traffic from them
+            if drift_monitor is not None:
+                drift_monitor.observe(X)
 
-        # Validate input shape
-        if X.shape[1] != 4:
-            raise ValueError(f"Expected 4 features, got {X.shape[1]}")
+            X_model, n_out_of_range = feature_schema.apply_range_policy(X, request.out_of_range)
 
         # Make predictions
-        predictions = model.predict(X)
+        with timer(timings, 'predict_ms'):
+            if quantized_predictor is not None:
+                predictions = quantized_predictor.predict(X_model)
+            else:
+                predictions = model.predict(X_model)
 
         # Convert to list
         pred_list = predictions.tolist()
@@ -153,7 +264,19 @@ async def predict_v1(request: PredictionRequest):
         # Get class names
         class_list = [CLASS_NAMES[p] for p in pred_list]
 
-        logger.info(f"Predictions: {pred_list} -> {class_list}")
+        # Only a sample of requests is logged, without the prediction list. Under
+        # drift every request may carry out-of-range rows, so the warning for rows
+        # predicted as-is is the same sampled record, raised to WARNING
+        if n_out_of_range and request.out_of_range == 'allow':
+            level = logging.WARNING
+        else:
+            level = logging.INFO
+        request_logger.log(level, "Prediction request served", extra={
+            'n_instances': len(pred_list),
+            'n_out_of_range': n_out_of_range,
+            'out_of_range_policy': request.out_of_range,
+            **timings,
+        })
 
         return {
             "predictions": pred_list,
@@ -161,7 +284,8 @@ async def predict_v1(request: PredictionRequest):
         }
 
     except ValueError as e:
-        logger.error(f"Validation error: {e}")
+        # Client errors can arrive at request rate, so they are sampled as well
+        request_logger.warning(f"Validation error: {e}", extra={'status_code': 400})
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Prediction error: {e}")
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# serve.py imports its modules as top-level files from the container's working
+# directory, so make them importable the same way here
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from drift import DriftMonitor, DriftStatistics, ReferenceProfile
+
+N_BINS = 10
+
+def build_reference(data, n_bins=N_BINS):
+    """Reference profile in the same layout train.py writes"""
+    bin_edges = np.linspace(data.min(axis=0), data.max(axis=0), n_bins + 1, axis=1)
+    bin_counts = [
+        [0] + np.histogram(data[:, i], bins=bin_edges[i])[0].tolist() + [0]
+        for i in range(data.shape[1])
+    ]
+    return ReferenceProfile(
+        feature_names=[f'feature_{i}' for i in range(data.shape[1])],
+        count=data.shape[0],
+        mean=data.mean(axis=0),
+        var=data.var(axis=0, ddof=1),
+        bin_edges=bin_edges,
+        bin_counts=bin_counts,
+    )
+
+def expected_histogram(values, edges):
+    """np.histogram with an underflow and an overflow bin added"""
+    inside = np.histogram(values, bins=edges)[0]
+    return np.concatenate([[np.sum(values < edges[0])], inside, [np.sum(values > edges[-1])]])
+
+@pytest.fixture
+def reference():
+    rng = np.random.default_rng(0)
+    return build_reference(rng.normal([0.0, 5.0, -3.0], [1.0, 2.0, 0.5], size=(500, 3)))
+
+def test_merged_batches_match_numpy(reference):
+    rng = np.random.default_rng(1)
+    # Shifted traffic with values outside the reference range and on the bin edges
+    batches = [rng.normal([0.5, 5.0, -3.0], [1.5, 2.0, 0.5], size=(n, 3)) for n in (1, 7, 250, 64)]
+    batches.append(reference.bin_edges.T.copy())
+    batches.append(reference.bin_edges.T.astype(np.float32))
+
+    stats = DriftStatistics(reference)
+    for X in batches:
+        stats.update(X)
+
+    data = np.concatenate([X.astype(np.float64) for X in batches])
+    assert stats.count == data.shape[0]
+    np.testing.assert_allclose(stats.mean, data.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(stats.var, data.var(axis=0, ddof=1), rtol=1e-10)
+    for i in range(data.shape[1]):
+        np.testing.assert_array_equal(stats.bin_counts[i], expected_histogram(data[:, i], reference.bin_edges[i]))
+
+def test_empty_batch_is_ignored(reference):
+    stats = DriftStatistics(reference)
+    stats.update(np.empty((0, 3)))
+    assert stats.count == 0
+
+def test_scores_are_null_before_the_first_batch(reference):
+    scores = DriftStatistics(reference).scores()
+
+    for i, feature in enumerate(scores.values()):
+        assert feature['psi'] is None
+        assert feature['mean_shift'] is None
+        assert feature['reference_mean'] == pytest.approx(reference.mean[i])
+
+def test_scores_detect_shift(reference):
+    rng = np.random.default_rng(2)
+    stable = DriftStatistics(reference)
+    stable.update(rng.normal([0.0, 5.0, -3.0], [1.0, 2.0, 0.5], size=(5000, 3)))
+    shifted = DriftStatistics(reference)
+    shifted.update(rng.normal([2.0, 5.0, -3.0], [1.0, 2.0, 0.5], size=(5000, 3)))
+
+    assert stable.scores()['feature_0']['psi'] < 0.05
+    assert shifted.scores()['feature_0']['psi'] > 1.0
+    assert shifted.scores()['feature_0']['mean_shift'] == pytest.approx(2.0, abs=0.2)
+    assert shifted.scores()['feature_1']['psi'] < 0.05
+
+def test_monitor_updates_in_the_background(reference):
+    monitor = DriftMonitor(reference)
+    monitor.start()
+    for _ in range(5):
+        monitor.observe(np.zeros((10, 3)))
+    monitor.stop()
+
+    report = monitor.report()
+    assert report['observed_instances'] == 50
+    assert report['dropped_batches'] == 0
+    assert report['pending_batches'] == 0
+
+def test_monitor_drops_batches_when_full(reference):
+    monitor = DriftMonitor(reference, max_queue_size=2)
+    for _ in range(5):
+        monitor.observe(np.zeros((1, 3)))
+
+    assert monitor.dropped_batches == 3
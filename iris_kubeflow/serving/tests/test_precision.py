@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+import xgboost as xgb
+from sklearn.datasets import load_iris
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+from precision import QuantizedPredictor, split_thresholds
+
+@pytest.fixture(scope='module')
+def iris():
+    return load_iris()
+
+@pytest.fixture(scope='module')
+def xgboost_model(iris):
+    model = xgb.XGBClassifier(n_estimators=20, max_depth=3, objective='multi:softprob', random_state=42)
+    return model.fit(iris.data, iris.target)
+
+@pytest.fixture(scope='module')
+def forest_model(iris):
+    return RandomForestClassifier(n_estimators=10, random_state=42).fit(iris.data, iris.target)
+
+def probe_values(thresholds):
+    """Every threshold and its float32 neighbours one ulp below and above"""
+    t = thresholds.astype(np.float32)
+    return np.concatenate([
+        t, np.nextafter(t, np.float32(-np.inf)), np.nextafter(t, np.float32(np.inf))
+    ])
+
+def probe_batch(data, thresholds):
+    """Iris rows with one feature at a time replaced by each probe value for it"""
+    rows = [data.astype(np.float32)]
+    for f, t in enumerate(thresholds):
+        values = probe_values(t)
+        for base in data[::15].astype(np.float32):
+            X = np.repeat(base[None, :], values.size, axis=0)
+            X[:, f] = values
+            rows.append(X)
+    return np.concatenate(rows)
+
+def test_sklearn_thresholds_are_strict_float32_splits(forest_model):
+    thresholds = split_thresholds(forest_model, 4)
+
+    for f, strict in enumerate(thresholds):
+        raw = np.unique(np.concatenate([e.tree_.threshold[e.tree_.feature == f] for e in forest_model.estimators_]))
+        below = np.nextafter(strict, np.float32(-np.inf))
+        assert strict.dtype == np.float32
+        assert strict.size == raw.size
+        # sklearn goes left when x <= raw; the strict threshold is the first float32 above it
+        assert np.all(strict.astype(np.float64) > raw)
+        assert np.all(below.astype(np.float64) <= raw)
+
+def test_xgboost_thresholds_are_split_conditions(xgboost_model):
+    thresholds = split_thresholds(xgboost_model, 4)
+    dump = xgboost_model.get_booster().trees_to_dataframe()
+    splits = dump[dump['Feature'] != 'Leaf']
+
+    for f, t in enumerate(thresholds):
+        expected = np.unique(splits.loc[splits['Feature'] == f'f{f}', 'Split'].astype(np.float32))
+        np.testing.assert_array_equal(t, expected)
+
+def test_non_tree_models_are_not_quantized(iris):
+    model = LogisticRegression(max_iter=500).fit(iris.data, iris.target)
+    assert QuantizedPredictor.from_model(model, 4) is None
+
+@pytest.mark.parametrize('model_fixture', ['xgboost_model', 'forest_model'])
+@pytest.mark.parametrize('max_table_size', [0, 1_000_000])
+def test_quantized_predictions_match_model_at_every_threshold(request, iris, model_fixture, max_table_size):
+    model = request.getfixturevalue(model_fixture)
+    predictor = QuantizedPredictor.from_model(model, 4, max_table_size)
+    X = probe_batch(iris.data, predictor.thresholds)
+
+    assert (predictor.table is not None) == (max_table_size > 0)
+    np.testing.assert_array_equal(predictor.predict(X), model.predict(X))
+
+@pytest.mark.parametrize('model_fixture', ['xgboost_model', 'forest_model'])
+def test_float32_predictions_match_float64(request, iris, model_fixture):
+    model = request.getfixturevalue(model_fixture)
+    rng = np.random.default_rng(0)
+    X = rng.uniform(iris.data.min(axis=0), iris.data.max(axis=0), size=(2000, 4))
+
+    np.testing.assert_array_equal(model.predict(X.astype(np.float32)), model.predict(X))
+
+def test_quantize_round_trips_through_representatives(xgboost_model, iris):
+    predictor = QuantizedPredictor.from_model(xgboost_model, 4)
+    bins = predictor.quantize(iris.data.astype(np.float32))
+
+    np.testing.assert_array_equal(predictor.quantize(predictor.dequantize(bins)), bins)
@@ -0,0 +1,81 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from schema import FeatureSchema
+
+@pytest.fixture
+def schema():
+    return FeatureSchema(['a', 'b'], min_values=[0.0, 10.0], max_values=[1.0, 20.0])
+
+@pytest.mark.parametrize('instances', [
+    [[0.5, 15.0], [0.5]],
+    [[0.5, 'x']],
+    [0.5, 15.0],
+    [],
+    [[0.5, 15.0, 1.0]],
+])
+def test_to_array_rejects_malformed_batches(schema, instances):
+    with pytest.raises(ValueError):
+        schema.to_array(instances)
+
+def test_to_array_uses_schema_dtype(schema):
+    assert schema.to_array([[0.5, 15.0]]).dtype == np.float64
+    assert schema.with_dtype('float32').to_array([[0.5, 15.0]]).dtype == np.float32
+
+@pytest.mark.parametrize('value', [np.nan, np.inf, -np.inf])
+def test_non_finite_values_are_rejected(schema, value):
+    with pytest.raises(ValueError, match=r'NaN or infinite values, rows: \[1\]'):
+        schema.validate([[0.5, 15.0], [value, 15.0]], 'allow')
+
+def test_allow_keeps_out_of_range_rows(schema):
+    X, n_outside = schema.validate([[0.5, 15.0], [2.0, 15.0], [0.5, 5.0]], 'allow')
+
+    assert n_outside == 2
+    np.testing.assert_array_equal(X, [[0.5, 15.0], [2.0, 15.0], [0.5, 5.0]])
+
+def test_reject_lists_out_of_range_rows(schema):
+    with pytest.raises(ValueError, match=r'2 instance\(s\) outside the training feature range, rows: \[1, 2\]'):
+        schema.validate([[0.5, 15.0], [2.0, 15.0], [0.5, 5.0]], 'reject')
+
+def test_bounds_are_inclusive(schema):
+    _, n_outside = schema.validate([[0.0, 10.0], [1.0, 20.0]], 'reject')
+    assert n_outside == 0
+
+def test_clip_writes_to_a_copy(schema):
+    X = schema.to_array([[0.5, 15.0], [2.0, 5.0]])
+
+    clipped, n_outside = schema.check(X, 'clip')
+
+    assert n_outside == 1
+    np.testing.assert_array_equal(clipped, [[0.5, 15.0], [1.0, 10.0]])
+    np.testing.assert_array_equal(X, [[0.5, 15.0], [2.0, 5.0]])
+
+def test_unsupported_policy(schema):
+    with pytest.raises(ValueError, match='Unsupported out_of_range policy'):
+        schema.validate([[0.5, 15.0]], 'ignore')
+
+def test_float32_overflow_is_out_of_range_not_infinite(schema):
+    schema32 = schema.with_dtype('float32')
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        X = schema32.to_array([[1e39, 15.0], [-1e39, 15.0]])
+
+    np.testing.assert_array_equal(X[:, 0], [np.finfo(np.float32).max, -np.finfo(np.float32).max])
+    with pytest.raises(ValueError, match=r'outside the training feature range, rows: \[0, 1\]'):
+        schema32.check(X, 'reject')
+    clipped, _ = schema32.check(X, 'clip')
+    np.testing.assert_array_equal(clipped[:, 0], [1.0, 0.0])
+
+def test_float32_keeps_real_infinities(schema):
+    with pytest.raises(ValueError, match='NaN or infinite values'):
+        schema.with_dtype('float32').validate([[np.inf, 15.0]])
+
+def test_round_trip_through_dict(schema):
+    loaded = FeatureSchema.from_dict(schema.to_dict())
+
+    assert loaded.feature_names == schema.feature_names
+    np.testing.assert_array_equal(loaded.min_values, schema.min_values)
+    np.testing.assert_array_equal(loaded.max_values, schema.max_values)